@@ -0,0 +1,131 @@
+#自研的 QUBO 基线求解器：R 个副本并行的模拟退火（SA）/ 并行回火（PT），直接在稀疏 Q 上运行，用于校准 GNN 的结果
+#与 local_search 相同，记 S = Q_off + Q_off^T、局部场 H = X S（每个副本一行），翻转 i 的能量变化为 (1 - 2 x_i)(Q_ii + H_i)
+#每个 sweep 按图着色逐色更新：同色节点两两不相邻，所有副本中同色节点的 Metropolis 翻转可以同时进行，
+#翻转后只用被翻转节点所在的行增量更新 H，每个 sweep 的代价为 O(R E)
+#python annealing.py data/G14.txt [sa|pt] [n_sweeps]
+from time import time
+import numpy as np
+import torch
+from graph_cache import load_graph
+from local_search import symmetric_qubo, qubo_energy, _neighbor_min
+
+def color_classes(S, seed=0):
+    """
+    把节点分成若干个颜色类，每类是一个极大独立集（随机优先级的 Jones-Plassmann 轮次，见 local_search._neighbor_min）
+    3-正则图通常只需 4~5 种颜色；返回节点下标数组的列表
+    """
+    n = S.shape[0]
+    priority = np.random.default_rng(seed).permutation(n).astype(np.float64)
+    remaining = np.ones(n, dtype=bool)
+    classes = []
+    while remaining.any():
+        chosen = np.zeros(n, dtype=bool)
+        free = remaining.copy()
+        while free.any():
+            rank = np.where(free, priority, np.inf)
+            pick = free & (rank < _neighbor_min(S, rank))
+            chosen |= pick
+            free &= ~pick
+            free &= (S @ pick.astype(np.float64)) == 0
+        classes.append(np.flatnonzero(chosen))
+        remaining &= ~chosen
+    return classes
+
+def default_temperatures(S, diag):
+    # 温度按单次翻转能量变化的典型尺度取：最高温约为其一半，最低温为其 1/200
+    scale = float(np.mean(np.abs(diag) + np.asarray(abs(S).sum(axis=1)).reshape(-1)))
+    scale = max(scale, 1e-9)
+    return scale / 200, scale / 2
+
+def anneal(Q, n_replicas=32, n_sweeps=1000, method='sa', t_min=None, t_max=None, x0=None, seed=None, S_diag=None):
+    """
+    method='sa'：所有副本从 t_max 按几何级数降温到 t_min
+    method='pt'：副本固定在 t_min..t_max 的几何温度阶梯上，每个 sweep 后交替尝试交换相邻温度的副本
+    Q 为 scipy 稀疏矩阵、稠密张量或 (row, col, weight, diag)；x0 为初始比特串（(N,) 或 (R, N)），默认随机
+    返回 (best_x, best_energy, X, energies)：全程能量最低的 int64 比特串及其能量，以及结束时全部副本的状态和能量
+    """
+    rng = np.random.default_rng(seed)
+    S, diag = symmetric_qubo(Q) if S_diag is None else S_diag
+    n = len(diag)
+    default_min, default_max = default_temperatures(S, diag)
+    t_min = default_min if t_min is None else t_min
+    t_max = default_max if t_max is None else t_max
+
+    if x0 is None:
+        X = rng.integers(0, 2, size=(n_replicas, n)).astype(np.float64)
+    else:
+        X = np.broadcast_to(np.asarray(x0, dtype=np.float64), (n_replicas, n)).copy()
+    H = np.asarray(S @ X.T).T
+    energies = X @ diag + 0.5 * (X * H).sum(axis=1)
+
+    classes = color_classes(S, seed=0 if seed is None else seed)
+    # 每个颜色类的 S 行转置后保存，dx @ S[idx] 即 (S[idx].T @ dx.T).T
+    rows_t = [S[idx].T.tocsr() for idx in classes]
+
+    ladder = t_min * (t_max / t_min) ** (np.arange(n_replicas) / max(1, n_replicas - 1))
+    order = np.arange(n_replicas)   #pt：order[k] 为当前处在第 k 个温度上的副本
+    best = int(np.argmin(energies))
+    best_energy, best_x = energies[best], X[best].copy()
+
+    for sweep in range(n_sweeps):
+        if method == 'sa':
+            beta = np.full(n_replicas, 1. / (t_max * (t_min / t_max) ** (sweep / max(1, n_sweeps - 1))))
+        else:
+            beta = np.empty(n_replicas)
+            beta[order] = 1. / ladder
+        for idx, S_t in zip(classes, rows_t):
+            delta = (1 - 2 * X[:, idx]) * (diag[idx] + H[:, idx])
+            accept = (delta <= 0) | (rng.random(delta.shape) < np.exp(-np.maximum(delta, 0) * beta[:, None]))
+            if not accept.any():
+                continue
+            dx = np.where(accept, 1 - 2 * X[:, idx], 0.)
+            X[:, idx] += dx
+            H += np.asarray(S_t @ dx.T).T
+            energies += (delta * accept).sum(axis=1)
+
+        if method == 'pt':
+            # 偶数轮交换 (0,1), (2,3)...，奇数轮交换 (1,2), (3,4)...；只交换温度分配，不复制状态
+            k = np.arange(sweep % 2, n_replicas - 1, 2)
+            a, b = order[k], order[k + 1]
+            log_p = (energies[a] - energies[b]) * (1. / ladder[k] - 1. / ladder[k + 1])
+            swap = np.log(rng.random(len(k))) < np.minimum(log_p, 0)
+            order[k[swap]], order[k[swap] + 1] = b[swap], a[swap]
+
+        current = int(np.argmin(energies))
+        if energies[current] < best_energy - 1e-9:
+            best_energy, best_x = energies[current], X[current].copy()
+
+    # 累加的能量有浮点误差，最终结果重新精确计算
+    energies = X @ diag + 0.5 * (X * np.asarray(S @ X.T).T).sum(axis=1)
+    return best_x.astype(np.int64), qubo_energy(S, diag, best_x), X.astype(np.int64), energies
+
+def solve(graph_file, is_max_cut=True, **anneal_kwargs):
+    """
+    与 GNN 求解器相同的接口：图文件 -> (最优比特串, 目标值, 耗时秒数)
+    目标值为 -能量（最大割时即割值）；anneal_kwargs 原样传给 anneal（n_replicas、n_sweeps、method 等）
+    """
+    edge_index, n_nodes, n_edges, Q = load_graph(graph_file, is_max_cut)
+    start = time()
+    best_x, best_energy, X, energies = anneal(Q, **anneal_kwargs)
+    return best_x, -best_energy, time() - start
+
+def embedding_init(states, n_nodes, in_features, scale=1., seed=None):
+    """
+    用退火得到的比特串初始化节点嵌入，供 create_gnn.get_gnn_params(..., embed_init=...) 使用
+    states 为 (K, N) 或 (N,) 的比特串（如 anneal 返回的最优解或结束时的各副本），前 K 列为 scale * (2x - 1)，
+    其余列与 nn.Embedding 默认初始化相同（标准正态）；返回 (n_nodes, in_features) 的张量
+    """
+    states = np.atleast_2d(np.asarray(states, dtype=np.float64))[:in_features]
+    generator = torch.Generator().manual_seed(seed) if seed is not None else None
+    weight = torch.randn(n_nodes, in_features, generator=generator)
+    weight[:, :len(states)] = torch.as_tensor(scale * (2 * states.T - 1), dtype=weight.dtype)
+    return weight
+
+if __name__ == "__main__":
+    import sys
+    graph_file = sys.argv[1] if len(sys.argv) > 1 else "data/G14.txt"
+    methods = [sys.argv[2]] if len(sys.argv) > 2 else ['sa', 'pt']
+    n_sweeps = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+    for method in methods:
+        best_x, cut, elapsed = solve(graph_file, method=method, n_sweeps=n_sweeps, seed=0)
+        print(f'{method}: cut {cut} in {round(elapsed, 3)}s ({n_sweeps} sweeps)')
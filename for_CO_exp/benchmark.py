@@ -0,0 +1,143 @@
+#CO 流水线的规模基准：在合成的 Gset 图上（1k ~ 1M 节点）分阶段计时，不需要 LLM，CPU 上即可运行
+#阶段：parse（read_gset 解析文件）、qubo（稀疏 Q + 边列表）、model（模型和节点嵌入）、train（epochs/sec）、
+#rounding（best_rounding 批量取整）、cut（按边分块计算割值）；结果写成 JSON 或 CSV，便于不同提交之间对比
+#python benchmark.py --sizes 1000 10000 100000 1000000 --family regular --degree 3 --epochs 20 --out bench.json
+import argparse
+import csv
+import json
+import os
+import tempfile
+from time import time
+import torch
+import create_gnn
+from load_data import read_gset, gset_edge_index
+from co_corefunc import create_sparse_Q, qubo_edge_list
+from rounding import best_rounding
+from large_graph import qubo_energy_chunked, peak_rss_bytes
+from synthetic import random_regular_edges, erdos_renyi_edges, write_gset
+from train_gnn import get_MyGNN, device1
+from torch_geometric.data import Data
+
+default_sizes = [1000, 10000, 100000, 1000000]
+default_link, default_ops = [0, 1, 2, 3], ['gcn', 'sage', 'graph', 'fc']
+
+def _sync():
+    # GPU 上的操作是异步的，计时前后都要同步
+    if device1.type == 'cuda':
+        torch.cuda.synchronize()
+
+def _timed(fn, *args, **kwargs):
+    _sync()
+    start = time()
+    result = fn(*args, **kwargs)
+    _sync()
+    return result, time() - start
+
+def generate(path, n_nodes, family='regular', degree=3, seed=0):
+    # 生成一张合成图并写成 Gset 文件，返回写文件的耗时
+    if family == 'regular':
+        edges = random_regular_edges(n_nodes, degree, seed)
+    elif family == 'er':
+        edges = erdos_renyi_edges(n_nodes, degree, seed)
+    else:
+        raise ValueError(f"unknown graph family: {family}")
+    _, elapsed = _timed(write_gset, path, edges, n_nodes)
+    return elapsed
+
+def benchmark_graph(path, link=default_link, option_list=default_ops, in_features=16, n_epochs=20, n_samples=64,
+                    sync_every=1):
+    """
+    对一个 Gset 文件依次计时各阶段，返回一行结果（dict），时间单位为秒
+    训练阶段只跑 n_epochs 个 epoch（早停可能让实际 epoch 数更少，按实际数计算 epochs_per_sec）
+    """
+    (edges, weights, n_nodes, n_edges), t_parse = _timed(read_gset, path)
+
+    def build_qubo():
+        Q = create_sparse_Q(edges, n_nodes)
+        edge_index = torch.from_numpy(gset_edge_index(edges)).to(device1)
+        return edge_index, qubo_edge_list(Q, device=device1)
+    (edge_index, Q), t_qubo = _timed(build_qubo)
+
+    (net, embed, optimizer), t_model = _timed(create_gnn.get_gnn_params, in_features, 1, n_nodes,
+                                              get_MyGNN(link, option_list))
+
+    result, t_train = _timed(create_gnn.run_gnn_training_GPT4GNAS, embed, None, Q, net, optimizer, edge_index, 0,
+                             sync_every, n_epochs)
+    epochs_run = result[1] + 1
+
+    with torch.no_grad():
+        probs = net(Data(x=embed.weight, edge_index=edge_index))[:, 0]
+    (bitstring, energy), t_rounding = _timed(best_rounding, probs, Q, n_samples)
+    cut, t_cut = _timed(lambda: -qubo_energy_chunked(bitstring, Q))
+
+    return {
+        'graph': os.path.basename(path),
+        'n_nodes': n_nodes,
+        'n_edges': n_edges,
+        'device': device1.type,
+        'parse_s': t_parse,
+        'qubo_s': t_qubo,
+        'model_s': t_model,
+        'train_s': t_train,
+        'epochs': epochs_run,
+        'epochs_per_sec': epochs_run / t_train,
+        'rounding_s': t_rounding,
+        'cut_s': t_cut,
+        'cut': cut,
+        'peak_rss_mb': peak_rss_bytes() / 2 ** 20,
+    }
+
+def run_sweep(sizes=default_sizes, family='regular', degree=3, seed=0, graph_dir=None, **kwargs):
+    """
+    对每个规模生成一张图并调用 benchmark_graph，返回结果行的列表；计时前先不计时地建一次模型预热
+    graph_dir 为 None 时图写在临时目录中、测完即删；否则保留，文件名形如 regular_d3_n1000_s0.txt
+    """
+    rows = []
+    keep = graph_dir is not None
+    graph_dir = graph_dir if keep else tempfile.mkdtemp(prefix="co_bench_")
+    os.makedirs(graph_dir, exist_ok=True)
+    # 不计时地先建一次模型，第一次建模型的一次性开销（算子初始化、内存分配器预热等）不计入第一行的 model_s
+    create_gnn.get_gnn_params(kwargs.get('in_features', 16), 1, 16,
+                              get_MyGNN(kwargs.get('link', default_link), kwargs.get('option_list', default_ops)))
+    for n_nodes in sizes:
+        path = os.path.join(graph_dir, "{}_d{}_n{}_s{}.txt".format(family, degree, n_nodes, seed))
+        t_generate = generate(path, n_nodes, family, degree, seed)
+        row = {'family': family, 'degree': degree, 'seed': seed, 'generate_s': t_generate}
+        row.update(benchmark_graph(path, **kwargs))
+        print(json.dumps(row))
+        rows.append(row)
+        if not keep:
+            os.remove(path)
+    if not keep:
+        os.rmdir(graph_dir)
+    return rows
+
+def write_report(rows, path):
+    # 按扩展名写 JSON（.json）或 CSV（其他）
+    if path.endswith('.json'):
+        with open(path, 'w') as f:
+            json.dump(rows, f, indent=2)
+        return
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scaling benchmark of the CO pipeline on synthetic Gset graphs")
+    parser.add_argument('--sizes', type=int, nargs='+', default=default_sizes)
+    parser.add_argument('--family', choices=['regular', 'er'], default='regular')
+    parser.add_argument('--degree', type=int, default=3, help="degree (regular) or average degree (er)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--epochs', type=int, default=20)
+    parser.add_argument('--in-features', type=int, default=16)
+    parser.add_argument('--samples', type=int, default=64, help="Bernoulli samples for the rounding stage")
+    parser.add_argument('--sync-every', type=int, default=1)
+    parser.add_argument('--graph-dir', default=None, help="keep the generated Gset files in this directory")
+    parser.add_argument('--out', default="benchmark.json", help="report path, .json or .csv")
+    args = parser.parse_args()
+
+    rows = run_sweep(args.sizes, args.family, args.degree, args.seed, args.graph_dir, in_features=args.in_features,
+                     n_epochs=args.epochs, n_samples=args.samples, sync_every=args.sync_every)
+    write_report(rows, args.out)
+    print(f'Wrote {len(rows)} rows to {args.out}')
@@ -0,0 +1,42 @@
+#CO 架构的对称性规范化：同一 link DAG 中可互换位置上的操作交换后得到同构的网络，只需训练一次
+#link 的第 i 个操作（DAG 节点 i+1）以节点 link[i] 为输入，自同构是保持这一父子关系的操作位置置换
+from itertools import permutations
+
+_automorphisms = {}
+
+def link_automorphisms(link):
+    """
+    返回 link DAG 的全部自同构，每个为置换 perm：位置 i 上的操作移到位置 perm[i]
+    需满足 link[perm[i]] == node_map(link[i])，其中 node_map(0) = 0，node_map(j) = perm[j - 1] + 1
+    """
+    link = tuple(link)
+    if link not in _automorphisms:
+        n = len(link)
+        autos = []
+        for perm in permutations(range(n)):
+            node_map = (0,) + tuple(p + 1 for p in perm)
+            if all(link[perm[i]] == node_map[link[i]] for i in range(n)):
+                autos.append(perm)
+        _automorphisms[link] = autos
+    return _automorphisms[link]
+
+def canonical_ops(link, option_list):
+    # 在所有自同构下取字典序最小的操作列表作为代表，同构的候选得到同一个结果
+    best = None
+    for perm in link_automorphisms(link):
+        ops = [None] * len(option_list)
+        for i, op in enumerate(option_list):
+            ops[perm[i]] = op
+        if best is None or ops < best:
+            best = ops
+    return best
+
+def orbit_size(link, option_list):
+    # 与 option_list 同构的不同操作列表个数
+    orbit = set()
+    for perm in link_automorphisms(link):
+        ops = [None] * len(option_list)
+        for i, op in enumerate(option_list):
+            ops[perm[i]] = op
+        orbit.add(tuple(ops))
+    return len(orbit)
@@ -1,48 +1,100 @@
 import numpy as np
-from pyqubo import Array
+import scipy.sparse
 import torch
-import networkx as nx
-import jax.numpy as jnp
 
-def create_max_cut_model(graph):
-    N = graph.number_of_nodes()     #计算图中节点数目
-    X = Array.create("X", shape=(N,), vartype="BINARY")     #将图中每个节点关联一个二元决策变量X
+def _unique_edges(edges):
+    # 去掉自环和重复边，并把每条边整理为 u < v 的形式（与 nx.Graph 的去重行为一致）
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    edges = np.sort(edges, axis=1)
+    return np.unique(edges, axis=0)
 
-    hamiltonian = 0
-    for u, v in graph.edges:    #对边进行筛选
-        hamiltonian -= (X[u] - X[v]) ** 2
+def create_max_cut_qubo(edges, n_nodes):
+    """H = -sum_{(u,v)} (x_u - x_v)^2  =>  Q[u,u] = -deg(u), Q[u,v] = 2 (u < v)"""
+    edges = _unique_edges(edges)
+    u, v = edges[:, 0], edges[:, 1]
+    deg = np.bincount(edges.ravel(), minlength=n_nodes)
+    diag = np.arange(n_nodes, dtype=np.int64)
+    row = np.concatenate((diag, u))
+    col = np.concatenate((diag, v))
+    val = np.concatenate((-deg, np.full(len(u), 2))).astype(np.float32)
+    return scipy.sparse.coo_matrix((val, (row, col)), shape=(n_nodes, n_nodes))
 
-    return hamiltonian.compile()
+def create_mis_qubo(edges, n_nodes, penalty=2):
+    """H = -sum_u x_u + penalty * sum_{(u,v)} x_u x_v  =>  Q[u,u] = -1, Q[u,v] = penalty (u < v)"""
+    edges = _unique_edges(edges)
+    u, v = edges[:, 0], edges[:, 1]
+    diag = np.arange(n_nodes, dtype=np.int64)
+    row = np.concatenate((diag, u))
+    col = np.concatenate((diag, v))
+    val = np.concatenate((-np.ones(n_nodes), np.full(len(u), penalty))).astype(np.float32)
+    return scipy.sparse.coo_matrix((val, (row, col)), shape=(n_nodes, n_nodes))
 
-def create_mis_model(graph, penalty=2):
-    N = graph.number_of_nodes()
-    X = Array.create("X", shape=(N,), vartype="BINARY")
-
-    hamiltonian = -sum(X)
-    for u, v in graph.edges:
-        hamiltonian += penalty * (X[u] * X[v])
-
-    return hamiltonian.compile()
-
-def create_Q_matrix(graph, is_max_cut=True):
+def create_sparse_Q(edges, n_nodes, is_max_cut=True, penalty=2):
+    # 直接由边数组构造上三角 QUBO 矩阵（CSR），不经过 pyqubo 的符号展开
     if is_max_cut:
-        model = create_max_cut_model(graph)     #hamiltonian
+        Q = create_max_cut_qubo(edges, n_nodes)
     else:
-        model = create_mis_model(graph)
+        Q = create_mis_qubo(edges, n_nodes, penalty)
+    return Q.tocsr()
+
+def create_Q_matrix(graph, is_max_cut=True, sparse=False):
+    # graph 的节点需为 0..N-1 的整数；sparse=True 时返回 scipy CSR，否则返回与旧版一致的稠密 torch 张量
     N = graph.number_of_nodes()
-    extract_val = lambda x: int(x[2:-1])    #从变量中提取整数部分
-    Q_matrix = np.zeros((N, N))
-    qubo_dict, _ = model.to_qubo()      #利用哈密顿量与目标图的信息，计算QUBO的问题矩阵Q
-    for (a, b), quv in qubo_dict.items():   #(a, b) = ('X[1]', 'X[0]'), quv = 2.0
-        u = min(extract_val(a), extract_val(b))
-        v = max(extract_val(a), extract_val(b))
-        Q_matrix[u, v] = quv    #创造问题矩阵Q
-    Q_matrix = torch.tensor(Q_matrix, dtype=torch.float32)
+    edges = np.array(list(graph.edges), dtype=np.int64).reshape(-1, 2)
+    Q_matrix = create_sparse_Q(edges, N, is_max_cut)
+    if sparse:
+        return Q_matrix
+    Q_matrix = torch.tensor(Q_matrix.toarray(), dtype=torch.float32)
 
     return Q_matrix
 
+def qubo_edge_list(Q_matrix, device=None):
+    # 把 Q（scipy 稀疏矩阵或稠密张量）拆成 (row, col, weight, diag)，供 O(E) 的 edge_loss_func 使用
+    if isinstance(Q_matrix, torch.Tensor):
+        Q_matrix = scipy.sparse.coo_matrix(Q_matrix.detach().cpu().numpy())
+    Q_matrix = scipy.sparse.coo_matrix(Q_matrix)
+    off = Q_matrix.row != Q_matrix.col
+    row = torch.as_tensor(Q_matrix.row[off], dtype=torch.long, device=device)
+    col = torch.as_tensor(Q_matrix.col[off], dtype=torch.long, device=device)
+    weight = torch.as_tensor(Q_matrix.data[off], dtype=torch.float32, device=device)
+    diag = torch.as_tensor(Q_matrix.diagonal(), dtype=torch.float32, device=device)
+    return row, col, weight, diag
+
+def edge_loss_func(probs, row, col, weight, diag):
+    # p^T Q p = sum_i Q_ii p_i^2 + sum_{(i,j), i!=j} Q_ij p_i p_j，按边 gather，反向时自动 scatter-add
+    # probs 为 (K, N) 时按最后一维计算，返回 K 个独立的损失
+    cost = (diag * probs * probs).sum(-1) + (weight * probs[..., row] * probs[..., col]).sum(-1)
+    return cost
+
 def loss_func(probs, Q_matrix):
+    if isinstance(Q_matrix, tuple):     #(row, col, weight, diag) 形式的 Q 走边列表损失
+        return edge_loss_func(probs, *Q_matrix)
+    if probs.dim() == 2:    #(K, N) 的批量概率，返回 (K,)
+        return ((probs @ Q_matrix) * probs).sum(-1)
     probs_ = torch.unsqueeze(probs, 1)  #将probs的维度扩展至（N，1）,才能与矩阵Q_matric相乘
     cost = (probs_.T @ Q_matrix @ probs_).squeeze()  #@表示矩阵乘法
     return cost
 
+def block_qubo(q_list, offsets):
+    """
+    把多张图的 (row, col, weight, diag) 拼成块对角的边列表，第 g 张图的节点编号整体偏移 offsets[g]
+    返回 (row, col, weight, diag, edge_graph, node_graph)，后两项为每条边 / 每个节点所属的图
+    """
+    rows, cols, weights, diags, edge_graph, node_graph = [], [], [], [], [], []
+    for g, (row, col, weight, diag) in enumerate(q_list):
+        rows.append(row + offsets[g])
+        cols.append(col + offsets[g])
+        weights.append(weight)
+        diags.append(diag)
+        edge_graph.append(torch.full_like(row, g))
+        node_graph.append(torch.full((len(diag),), g, dtype=torch.long, device=diag.device))
+    return (torch.cat(rows), torch.cat(cols), torch.cat(weights), torch.cat(diags),
+            torch.cat(edge_graph), torch.cat(node_graph))
+
+def graph_losses(probs, block_Q, n_graphs):
+    # 块对角 QUBO 上每张图各自的 p^T Q p，一次 gather + 两次 index_add 得到 (n_graphs,)
+    row, col, weight, diag, edge_graph, node_graph = block_Q
+    cost = torch.zeros(n_graphs, dtype=probs.dtype, device=probs.device)
+    cost = cost.index_add(0, node_graph, diag * probs * probs)
+    return cost.index_add(0, edge_graph, weight * probs[row] * probs[col])
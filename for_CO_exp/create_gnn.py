@@ -1,7 +1,8 @@
 #训练Gnn策略
 from itertools import chain
 from time import time
-from co_corefunc import loss_func
+from co_corefunc import loss_func, block_qubo, graph_losses
+from rounding import best_rounding
 import torch
 import torch.nn as nn
 from torch_geometric.data import Data
@@ -17,12 +18,16 @@ learning_rate = 0.01
 opt_params = {'lr': learning_rate}
 
 #get embed, net, optimizer
-def get_gnn_params(in_features, class_num, n_nodes, MyGraphNetwork):
+# embed_init 为 (n_nodes, in_features) 的张量时用它初始化节点嵌入（如 annealing.embedding_init 由退火解构造的嵌入）
+def get_gnn_params(in_features, class_num, n_nodes, MyGraphNetwork, embed_init=None):
 
     net = MyGraphNetwork(in_features, class_num)
     dim_embedding = in_features
     net = net.type(dtype).to(device1)
     embed = nn.Embedding(n_nodes, dim_embedding)
+    if embed_init is not None:
+        with torch.no_grad():
+            embed.weight.copy_(embed_init)
     embed = embed.type(dtype).to(device1)
 
     params = chain(net.parameters(), embed.parameters())
@@ -30,7 +35,17 @@ def get_gnn_params(in_features, class_num, n_nodes, MyGraphNetwork):
 
     return net, embed, optimizer
 
-def run_gnn_training_GPT4GNAS(embed, dgl_graph, q_torch, net, optimizer, edge_index):
+# dgl_graph 仅为兼容旧调用保留，节点数直接取自 embed
+# n_samples > 0 时，训练结束后对最终概率做批量随机取整（见 rounding.best_rounding），更优则替换 best_bitstring
+# sync_every > 1 时改用 run_gnn_training_sync_free，每 sync_every 个 epoch 才与主机同步一次
+# max_epochs 为本次训练的 epoch 上限（默认 number_epochs），供 successive halving 的低保真度训练使用
+def run_gnn_training_GPT4GNAS(embed, dgl_graph, q_torch, net, optimizer, edge_index, n_samples=0, sync_every=1,
+                              max_epochs=None):
+    if max_epochs is None:
+        max_epochs = number_epochs
+    if sync_every > 1:
+        return run_gnn_training_sync_free(embed, q_torch, net, optimizer, edge_index, n_samples, sync_every,
+                                          max_epochs)
     inputs = embed.weight
     data = Data(x=inputs, edge_index=edge_index)
     prev_loss = 1.
@@ -39,15 +54,16 @@ def run_gnn_training_GPT4GNAS(embed, dgl_graph, q_torch, net, optimizer, edge_in
     losses = []
     epochs = []
 
-    best_bitstring = torch.zeros((dgl_graph.number_of_nodes(),)).type(q_torch.dtype).to(
-        q_torch.device)  # 初始化全为0一个二进制张量，将图中每个节点关联一个二进制变量x
+    # q_torch 可以是稠密 Q，也可以是 qubo_edge_list 得到的 (row, col, weight, diag)
+    best_bitstring = torch.zeros((inputs.shape[0],)).type(inputs.dtype).to(
+        inputs.device)  # 初始化全为0一个二进制张量，将图中每个节点关联一个二进制变量x
     best_loss = loss_func(best_bitstring.float(), q_torch)
 
     print("best_bitstring_shape", best_bitstring.shape)
     print("best_loss_shape", best_loss.shape)
 
     t_gnn_start = time()
-    for epoch in range(number_epochs):
+    for epoch in range(max_epochs):
         probs = net(data)[:, 0]
         loss = loss_func(probs, q_torch)
         loss_ = loss.detach().item()
@@ -78,11 +94,165 @@ def run_gnn_training_GPT4GNAS(embed, dgl_graph, q_torch, net, optimizer, edge_in
         optimizer.step()
 
     t_gnn = time() - t_gnn_start
-    print(f'GNN training (n={dgl_graph.number_of_nodes()}) took {round(t_gnn, 3)}')
+    print(f'GNN training (n={inputs.shape[0]}) took {round(t_gnn, 3)}')
     print(f'GNN final continuous loss: {loss_}')
     print(f'GNN best continuous loss: {best_loss}')
     #print(best_bitstring)
 
     finial_bitstring = (probs.detach() >= prob_threshold) * 1
+    if n_samples > 0:
+        rounded, rounded_loss = best_rounding(probs, q_torch, n_samples)
+        if rounded_loss < best_loss:
+            print(f'Stochastic rounding improved the loss: {float(best_loss)} -> {float(rounded_loss)}')
+            best_loss = rounded_loss
+            best_bitstring = rounded
 
     return net, epoch, finial_bitstring, best_bitstring, losses, epochs
+
+def run_gnn_training_sync_free(embed, q_torch, net, optimizer, edge_index, n_samples=0, sync_every=100,
+                               max_epochs=None):
+    """
+    与 run_gnn_training_GPT4GNAS 相同的训练与早停规则，但最优损失、最优比特串和 patience 计数都用 torch.where 留在设备上，
+    只在每 sync_every 个 epoch（以及每 out 个 epoch 打印时）读回标量
+    触发早停的 epoch 在设备上精确记录，之后的更新被屏蔽，因此 best_bitstring / best_loss / epoch 与逐 epoch 判断一致；
+    循环最多多跑 sync_every - 1 个 epoch，只影响 final_bitstring
+    """
+    if max_epochs is None:
+        max_epochs = number_epochs
+    inputs = embed.weight
+    device = inputs.device
+    data = Data(x=inputs, edge_index=edge_index)
+    prev_loss = torch.ones((), dtype=torch.float64, device=device)
+    count = torch.zeros((), dtype=torch.long, device=device)
+    stop_epoch = torch.full((), -1, dtype=torch.long, device=device)
+
+    losses = []
+    epochs = []
+
+    best_bitstring = torch.zeros((inputs.shape[0],)).type(inputs.dtype).to(device)
+    best_loss = loss_func(best_bitstring, q_torch).detach()
+
+    t_gnn_start = time()
+    for epoch in range(max_epochs):
+        probs = net(data)[:, 0]
+        loss = loss_func(probs, q_torch)
+        loss_d = loss.detach()
+
+        running = stop_epoch < 0
+        improved = running & (loss_d < best_loss)
+        best_loss = torch.where(improved, loss_d, best_loss)
+        bitstring = (probs.detach() >= prob_threshold).type(best_bitstring.dtype)
+        best_bitstring = torch.where(improved, bitstring, best_bitstring)
+
+        if epoch % out == 0:
+            loss_ = loss_d.item()
+            print(f'Epoch: {epoch}, Loss:{loss_}')
+            losses.append(loss_)
+            epochs.append(epoch)
+
+        # 与逐 epoch 版本相同的 tol/patience 规则，用 float64 比较以保持与 Python float 一致
+        diff = loss_d.double() - prev_loss
+        stalled = (diff.abs() <= tol) | (diff > 0)
+        count = torch.where(stalled, count + 1, torch.zeros_like(count))
+        stop_epoch = torch.where(running & (count >= patience), torch.full_like(stop_epoch, epoch), stop_epoch)
+
+        if (epoch + 1) % sync_every == 0 and stop_epoch.item() >= 0:
+            break
+
+        prev_loss = loss_d.double()
+
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+
+    stop = stop_epoch.item()
+    if stop >= 0:
+        print(f'Stopping early on epoch {stop}(patience: {patience})')
+        epoch = stop
+
+    t_gnn = time() - t_gnn_start
+    print(f'GNN training (n={inputs.shape[0]}) took {round(t_gnn, 3)}')
+    print(f'GNN final continuous loss: {loss_d.item()}')
+    print(f'GNN best continuous loss: {best_loss.item()}')
+
+    finial_bitstring = (probs.detach() >= prob_threshold) * 1
+    if n_samples > 0:
+        rounded, rounded_loss = best_rounding(probs, q_torch, n_samples)
+        if rounded_loss < best_loss:
+            print(f'Stochastic rounding improved the loss: {float(best_loss)} -> {float(rounded_loss)}')
+            best_loss = rounded_loss
+            best_bitstring = rounded
+
+    return net, epoch, finial_bitstring, best_bitstring, losses, epochs
+
+def run_gnn_training_multi_graph(embed, q_list, net, optimizer, edge_index, offsets, n_samples=0, max_epochs=None):
+    """
+    一次前向/反向同时在多张图上训练：edge_index 为块对角的不相交并图，第 g 张图占节点 offsets[g]:offsets[g+1]，
+    每张图有自己的一份节点嵌入和损失（q_list[g] 为该图局部编号的 (row, col, weight, diag)），GNN 参数在图之间共享
+    每张图各自记录最优比特串和早停计数，已早停的图不再贡献梯度
+    返回的 final_bitstring / best_bitstring 形状为 (offsets[-1],)，best_loss 形状为 (n_graphs,)
+    """
+    if max_epochs is None:
+        max_epochs = number_epochs
+    inputs = embed.weight
+    n_graphs = len(q_list)
+    block_Q = block_qubo(q_list, offsets)
+    node_graph = block_Q[-1]
+    data = Data(x=inputs, edge_index=edge_index)
+    prev_loss = torch.ones(n_graphs)
+    count = torch.zeros(n_graphs, dtype=torch.long)
+    active = torch.ones(n_graphs, dtype=torch.bool)
+
+    losses = []
+    epochs = []
+
+    best_bitstring = torch.zeros((inputs.shape[0],)).type(inputs.dtype).to(inputs.device)
+    best_loss = graph_losses(best_bitstring, block_Q, n_graphs).detach()
+
+    t_gnn_start = time()
+    for epoch in range(max_epochs):
+        probs = net(data)[:, 0]
+        loss = graph_losses(probs, block_Q, n_graphs)
+        loss_ = loss.detach().cpu()    #每个 epoch 只同步一次，而不是每张图一次
+
+        bitstring = (probs.detach() >= prob_threshold) * 1
+        improved = (loss.detach() < best_loss) & active.to(loss.device)
+        best_loss = torch.where(improved, loss.detach(), best_loss)
+        node_improved = improved[node_graph]
+        best_bitstring[node_improved] = bitstring[node_improved].type(best_bitstring.dtype)
+
+        if epoch % out == 0:
+            print(f'Epoch: {epoch}, Loss:{loss_.tolist()}')
+            losses.append(loss_.tolist())
+            epochs.append(epoch)
+
+        stalled = ((loss_ - prev_loss).abs() <= tol) | ((loss_ - prev_loss) > 0)
+        count = torch.where(stalled, count + 1, torch.zeros_like(count))
+        stopped = active & (count >= patience)
+        if stopped.any():
+            print(f'Stopping graphs {stopped.nonzero().view(-1).tolist()} early on epoch {epoch}(patience: {patience})')
+            active &= ~stopped
+        if not active.any():
+            break
+
+        prev_loss = loss_
+
+        optimizer.zero_grad()
+        loss[active.to(loss.device)].sum().backward()
+        optimizer.step()
+
+    t_gnn = time() - t_gnn_start
+    print(f'GNN training (n={list(offsets)} over {n_graphs} graphs) took {round(t_gnn, 3)}')
+    print(f'GNN final continuous loss: {loss_.tolist()}')
+    print(f'GNN best continuous loss: {best_loss.tolist()}')
+
+    finial_bitstring = (probs.detach() >= prob_threshold) * 1
+    if n_samples > 0:
+        for g in range(n_graphs):
+            lo, hi = offsets[g], offsets[g + 1]
+            rounded, rounded_loss = best_rounding(probs[lo:hi], q_list[g], n_samples)
+            if rounded_loss < best_loss[g]:
+                best_loss[g] = rounded_loss
+                best_bitstring[lo:hi] = rounded
+
+    return net, epoch, finial_bitstring, best_bitstring, best_loss, losses, epochs
@@ -0,0 +1,131 @@
+#常驻进程池：每个 worker 只导入一次 torch/PyG、只加载一次缓存图，之后反复接收 (link, ops, seed) 任务
+import os
+import multiprocessing as mp
+import numpy as np
+
+_worker_state = {}
+
+def _init_worker(graph_path, n_threads, train_kwargs):
+    import torch
+    from graph_cache import load_graph
+    from co_corefunc import qubo_edge_list
+    from train_gnn import device1
+
+    torch.set_num_threads(n_threads)
+    edge_index, n_nodes, n_edges, Q = load_graph(graph_path)
+    _worker_state.update({
+        'edge_index': torch.tensor(edge_index, dtype=torch.long, device=device1),
+        'n_nodes': n_nodes,
+        'Q': qubo_edge_list(Q, device=device1),
+        'train_kwargs': train_kwargs,
+    })
+
+def _run_job(job):
+    from time import time
+    import torch
+    from train_gnn import get_MyGNN, train_candidate
+
+    link, option_list, seed, overrides = job
+    if seed is not None:
+        torch.manual_seed(seed)
+    s = _worker_state
+    model = get_MyGNN(link, option_list)
+    # 单次任务的参数（如 successive halving 的 max_epochs）覆盖创建 pool 时的 train_kwargs
+    train_kwargs = dict(s['train_kwargs'], **overrides)
+    start = time()
+    result, best_solution, raw_result = train_candidate(model, s['edge_index'], s['n_nodes'], s['Q'],
+                                                        **train_kwargs)
+    best_solution = np.array([int(b) for b in best_solution], dtype=np.int8)
+    return result, best_solution, raw_result, time() - start
+
+def _run_warm_job(job):
+    from time import time
+    import torch
+    from train_gnn import get_MyGNN, train_candidate_warm
+
+    link, option_list, seed, overrides, parent_state = job
+    if seed is not None:
+        torch.manual_seed(seed)
+    s = _worker_state
+    train_kwargs = dict(s['train_kwargs'], **overrides)
+    start = time()
+    result, best_solution, raw_result, state = train_candidate_warm(get_MyGNN(link, option_list), s['edge_index'],
+                                                                    s['n_nodes'], s['Q'], parent_state,
+                                                                    **train_kwargs)
+    best_solution = np.array([int(b) for b in best_solution], dtype=np.int8)
+    return result, best_solution, raw_result, time() - start, state
+
+def _run_resume_job(job):
+    from time import time
+    import torch
+    from train_gnn import get_MyGNN, train_candidate_resume
+
+    link, option_list, seed, overrides, state = job
+    if seed is not None:
+        torch.manual_seed(seed)
+    s = _worker_state
+    train_kwargs = dict(s['train_kwargs'], **overrides)
+    start = time()
+    result, best_solution, raw_result, state = train_candidate_resume(get_MyGNN(link, option_list), s['edge_index'],
+                                                                      s['n_nodes'], s['Q'], state, **train_kwargs)
+    best_solution = np.array([int(b) for b in best_solution], dtype=np.int8)
+    return result, best_solution, raw_result, time() - start, state
+
+class EvaluatorPool(object):
+    """
+    常驻 worker 进程池，n_workers 个进程各自固定使用 n_threads 个核（默认均分本机核数）
+    evaluate 按提交顺序返回 [(cut, best_bitstring, raw_cut, wall_time), ...]，submit 返回 AsyncResult 供调度器交错使用
+    train_kwargs 原样传给 train_gnn.train_candidate（IterNum、in_features、polish 等），
+    submit / evaluate 的关键字参数只对本次提交的任务覆盖这些默认值
+    """
+    def __init__(self, graph_path, n_workers=None, n_threads=None, **train_kwargs):
+        n_cores = os.cpu_count() or 1
+        if n_workers is None:
+            n_workers = max(1, n_cores // (n_threads or 1))
+        if n_threads is None:
+            n_threads = max(1, n_cores // n_workers)
+        self.graph_path = graph_path
+        self.train_kwargs = train_kwargs
+        self.n_workers = n_workers
+        self.n_threads = n_threads
+        # spawn：子进程不继承父进程的 torch 线程池 / CUDA 上下文
+        ctx = mp.get_context('spawn')
+        self.pool = ctx.Pool(n_workers, initializer=_init_worker,
+                             initargs=(graph_path, n_threads, train_kwargs))
+
+    def submit(self, link, option_list, seed=None, **train_kwargs):
+        return self.pool.apply_async(_run_job, ((list(link), list(option_list), seed, train_kwargs),))
+
+    def evaluate(self, link, gnn_list, seeds=None, **train_kwargs):
+        if seeds is None:
+            seeds = [None] * len(gnn_list)
+        jobs = [(list(link), list(ops), seed, train_kwargs) for ops, seed in zip(gnn_list, seeds)]
+        return self.pool.map(_run_job, jobs, chunksize=1)
+
+    def evaluate_warm(self, link, gnn_list, parent_states, seeds=None, **train_kwargs):
+        # 热启动版本：父代参数随任务发送，返回 [(cut, best_bitstring, raw_cut, wall_time, state), ...]
+        if seeds is None:
+            seeds = [None] * len(gnn_list)
+        jobs = [(list(link), list(ops), seed, train_kwargs, parent)
+                for ops, seed, parent in zip(gnn_list, seeds, parent_states)]
+        return self.pool.map(_run_warm_job, jobs, chunksize=1)
+
+    def evaluate_resume(self, link, gnn_list, states, seeds=None, **train_kwargs):
+        # 可续训版本（successive halving 用）：上一轮的 state 随任务发送，返回 [(cut, best_bitstring, raw_cut, wall_time, state), ...]
+        if seeds is None:
+            seeds = [None] * len(gnn_list)
+        jobs = [(list(link), list(ops), seed, train_kwargs, state)
+                for ops, seed, state in zip(gnn_list, seeds, states)]
+        return self.pool.map(_run_resume_job, jobs, chunksize=1)
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.pool.terminate()
+        self.close()
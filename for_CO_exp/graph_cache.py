@@ -0,0 +1,68 @@
+#Gset 图的磁盘缓存：按文件内容哈希保存 edge_index、节点数、边数和稀疏 Q，之后的调用直接内存映射读取
+import hashlib
+import json
+import os
+import numpy as np
+import scipy.sparse
+from load_data import read_gset, gset_edge_index
+from co_corefunc import create_sparse_Q
+
+cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".graph_cache")
+cache_version = 2   #解析方式或 Q 的构造方式变化时加一，旧缓存自动失效
+
+_memory_cache = {}  #同一进程内重复调用不再访问磁盘
+
+def file_hash(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _save(entry_dir, name, array):
+    #先写临时文件再原子替换，多个进程同时写同一个缓存也不会读到半个文件
+    tmp = os.path.join(entry_dir, "{}.{}.tmp.npy".format(name, os.getpid()))
+    np.save(tmp, array)
+    os.replace(tmp, os.path.join(entry_dir, name + ".npy"))
+
+def _load(entry_dir, name):
+    return np.load(os.path.join(entry_dir, name + ".npy"), mmap_mode='r')
+
+def load_graph(path, is_max_cut=True, cache_dir=cache_dir):
+    """
+    读取 Gset 文件，返回 (edge_index, n_nodes, n_edges, Q)
+    edge_index 为 (2, 2E) 的 int64 数组，Q 为 scipy CSR 矩阵；两者在命中缓存时都是只读的内存映射
+    """
+    key = file_hash(path)
+    q_name = "q_maxcut" if is_max_cut else "q_mis"
+    if (key, q_name) in _memory_cache:
+        return _memory_cache[(key, q_name)]
+
+    entry_dir = os.path.join(cache_dir, "v{}_{}".format(cache_version, key))
+    meta_file = os.path.join(entry_dir, "meta.json")
+    q_file = os.path.join(entry_dir, q_name + "_indptr.npy")
+    if not (os.path.exists(meta_file) and os.path.exists(q_file)):
+        os.makedirs(entry_dir, exist_ok=True)
+        edges, weights, n_nodes, n_edges = read_gset(path)
+        edge_index = gset_edge_index(edges)
+        Q = create_sparse_Q(edges, n_nodes, is_max_cut)
+        _save(entry_dir, "edge_index", edge_index)
+        _save(entry_dir, q_name + "_data", Q.data)
+        _save(entry_dir, q_name + "_indices", Q.indices)
+        _save(entry_dir, q_name + "_indptr", Q.indptr)
+        tmp = meta_file + ".{}.tmp".format(os.getpid())
+        with open(tmp, 'w') as f:
+            json.dump({'n_nodes': int(n_nodes), 'n_edges': int(n_edges), 'source': os.path.basename(path)}, f)
+        os.replace(tmp, meta_file)
+
+    with open(meta_file, 'r') as f:
+        meta = json.load(f)
+    n_nodes, n_edges = meta['n_nodes'], meta['n_edges']
+    edge_index = _load(entry_dir, "edge_index")
+    Q = scipy.sparse.csr_matrix((_load(entry_dir, q_name + "_data"),
+                                 _load(entry_dir, q_name + "_indices"),
+                                 _load(entry_dir, q_name + "_indptr")), shape=(n_nodes, n_nodes), copy=False)
+
+    result = (edge_index, n_nodes, n_edges, Q)
+    _memory_cache[(key, q_name)] = result
+    return result
@@ -0,0 +1,129 @@
+#大图模式（10 万 ~ 100 万节点）：全程不构造任何 N x N 结构
+#图以 int32 的 CSR 保存在主机上，QUBO 直接由边数组生成 (row, col, weight, diag) 边列表，节点嵌入维度可调低，
+#取整打分和最终割值按边分块计算；训练复用 create_gnn 的训练循环和 train_gnn 的模型
+#
+#训练增加的峰值内存（字节，float32 = 4、int64 = 8；N 节点、E 条无向边、嵌入维度 F、隐藏维度 h、n_ops 个操作）约为
+#    24 N F                              节点嵌入 + 梯度 + Adam 的两个动量，以及 foreach Adam 每步的两份参数大小的临时量
+#  + 52 E + 4 N                          设备上的 edge_index (2, 2E) 和 QUBO 边列表
+#  + 112 E + 28 N                        propagation.PropagationCache（gcn / sym / cheb 边权和 CSR 邻接）
+#  + 80 E                                构造缓存时 coalesce / to_sparse_csr 的下标和边权副本
+#  + n_ops (8 h E + 12 h N)              每个操作为反向保存的消息和节点激活（relu、dropout 的输出和掩码）
+#  + 16 h E + 8 h N                      正在前向/反向的那个操作的边上 gather / scatter 缓冲（消息及其梯度，各 (2E + N) x h）
+#  + 20 E                                边列表损失为反向保存的 gather 结果及其梯度
+#见 peak_memory_bytes；N = 1e6、E = 1.5e6（3-正则）、F = 16、h = 5、n_ops = 4 时估计约 1385MB
+#实测（CPU，train_large，sync_every=100）：导入 torch 后约 686MB，建图后约 799MB，训练后峰值 RSS 2363MB，即训练增加约 1564MB；
+#估计比实测少约 11%，差额没有逐项定位（推测主要是 malloc 对中等大小临时量的碎片），预留内存时按估计值的 1.15 倍计；F = 369 时仅嵌入就需要约 8.2GB
+import resource
+from time import time
+import numpy as np
+import torch
+import create_gnn
+from train_gnn import get_MyGNN, device1, dtype
+from synthetic import random_regular_edges
+
+chunk_edges = 1 << 22   #分块计算能量时每块的边数
+
+class LargeGraph(object):
+    """
+    主机上以 int32 CSR（indptr / indices）保存对称邻接，边数组 edges 为 (E, 2) 的 int32，每条边 u < v
+    PyG 和 index_add 需要 int64 的下标，因此 int64 的 edge_index / QUBO 边列表只在设备上按需生成一份
+    """
+    def __init__(self, edges, n_nodes):
+        edges = np.asarray(edges, dtype=np.int32).reshape(-1, 2)
+        self.edges = edges
+        self.n_nodes = int(n_nodes)
+        self.n_edges = len(edges)
+        row = np.concatenate((edges[:, 0], edges[:, 1]))
+        col = np.concatenate((edges[:, 1], edges[:, 0]))
+        order = np.lexsort((col, row))
+        index_dtype = np.int32 if len(row) < np.iinfo(np.int32).max else np.int64
+        self.indices = col[order].astype(index_dtype)
+        self.indptr = np.zeros(self.n_nodes + 1, dtype=index_dtype)
+        np.cumsum(np.bincount(row, minlength=self.n_nodes), out=self.indptr[1:])
+
+    def degree(self):
+        return np.diff(self.indptr)
+
+    def edge_index(self, device=device1):
+        # (2, 2E) 的 int64 edge_index，按行排序，与 load_data.gset_edge_index 的顺序一致
+        row = np.repeat(np.arange(self.n_nodes, dtype=np.int64), np.diff(self.indptr))
+        edge_index = torch.empty((2, len(row)), dtype=torch.long, device=device)
+        edge_index[0] = torch.from_numpy(row).to(device)
+        edge_index[1] = torch.from_numpy(self.indices).to(device).long()
+        return edge_index
+
+    def max_cut_qubo(self, device=device1):
+        # 与 co_corefunc.create_max_cut_qubo + qubo_edge_list 相同的 (row, col, weight, diag)，但不经过 scipy 的 COO / CSR
+        row = torch.from_numpy(self.edges[:, 0]).to(device).long()
+        col = torch.from_numpy(self.edges[:, 1]).to(device).long()
+        weight = torch.full((self.n_edges,), 2., dtype=dtype, device=device)
+        diag = -torch.from_numpy(self.degree()).to(device).type(dtype)
+        return row, col, weight, diag
+
+def qubo_energy_chunked(x, Q, chunk_edges=chunk_edges):
+    # 不求梯度地计算 x^T Q x，边列表按 chunk_edges 分块，中间张量不超过一块的大小
+    row, col, weight, diag = Q
+    with torch.no_grad():
+        x = x.type(dtype)
+        energy = (diag * x * x).sum()
+        for start in range(0, row.numel(), chunk_edges):
+            end = start + chunk_edges
+            energy += (weight[start:end] * x[row[start:end]] * x[col[start:end]]).sum()
+    return float(energy)
+
+def peak_memory_bytes(n_nodes, n_edges, in_features=16, hidden_dim=5, n_ops=4):
+    # 文件头部公式的逐项估计（训练相对建图之后增加的峰值），返回 {项: 字节数}，'total' 为总和
+    terms = {
+        'embedding_and_adam': 24 * n_nodes * in_features,
+        'edge_index_and_qubo': 52 * n_edges + 4 * n_nodes,
+        'propagation_cache': 112 * n_edges + 28 * n_nodes,
+        'propagation_cache_build': 80 * n_edges,
+        'saved_activations': n_ops * (8 * hidden_dim * n_edges + 12 * hidden_dim * n_nodes),
+        'gather_scatter_buffers': 16 * hidden_dim * n_edges + 8 * hidden_dim * n_nodes,
+        'loss': 20 * n_edges,
+    }
+    terms['total'] = sum(terms.values())
+    return terms
+
+def train_large(graph, link, option_list, in_features=16, max_epochs=None, n_samples=0, sync_every=100):
+    """
+    在 LargeGraph 上训练一个候选架构，返回 (割值, int8 比特串)
+    与 train_gnn.train_candidate 不同，比特串保持为数组而不是逐元素的张量列表，割值按边分块计算
+    sync_every 默认使用不逐 epoch 同步的训练循环（见 create_gnn.run_gnn_training_sync_free）
+    """
+    edge_index = graph.edge_index(device1)
+    Q = graph.max_cut_qubo(device1)
+    net, embed, optimizer = create_gnn.get_gnn_params(in_features, 1, graph.n_nodes, get_MyGNN(link, option_list))
+    net, epoch, final_bitstring, best_bitstring, losses, epochs = create_gnn.run_gnn_training_GPT4GNAS(
+        embed, None, Q, net, optimizer, edge_index, n_samples, sync_every, max_epochs)
+    cut = -qubo_energy_chunked(best_bitstring, Q)
+    return cut, best_bitstring.detach().cpu().numpy().astype(np.int8)
+
+def peak_rss_bytes():
+    # 进程的峰值常驻内存（Linux 上 ru_maxrss 的单位为 KB）
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+if __name__ == "__main__":
+    #在 CPU 上用合成的 100 万节点 3-正则图跑一遍大图模式，并对比实测峰值内存与估计值
+    #python large_graph.py [n_nodes] [degree] [max_epochs]
+    import sys
+    n_nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    degree = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    max_epochs = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    link, option_list = [0, 1, 2, 3], ['gcn', 'sage', 'graph', 'fc']
+
+    print(f'Peak RSS after importing torch: {round(peak_rss_bytes() / 2 ** 20, 1)} MB')
+    start = time()
+    graph = LargeGraph(random_regular_edges(n_nodes, degree, seed=0), n_nodes)
+    print(f'Generated {graph.n_nodes} nodes / {graph.n_edges} edges in {round(time() - start, 3)}s')
+    before = peak_rss_bytes()
+    print(f'Peak RSS after building the graph: {round(before / 2 ** 20, 1)} MB')
+    estimate = peak_memory_bytes(graph.n_nodes, graph.n_edges)
+    print('Estimated training memory (MB):', {k: round(v / 2 ** 20, 1) for k, v in estimate.items()})
+
+    start = time()
+    cut, bitstring = train_large(graph, link, option_list, max_epochs=max_epochs)
+    print(f'cut {cut} / {graph.n_edges} edges after {max_epochs} epochs in {round(time() - start, 3)}s')
+    after = peak_rss_bytes()
+    print(f'Peak RSS: {round(after / 2 ** 20, 1)} MB, training added {round((after - before) / 2 ** 20, 1)} MB '
+          f'(estimated {round(estimate["total"] / 2 ** 20, 1)} MB)')
@@ -1,13 +1,48 @@
-import dgl
 import numpy as np
 import torch
-import networkx as nx
 import scipy.sparse
-from networkx import convert_node_labels_to_integers
 device1 = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 dtype = torch.float32
 
+def read_gset(path):
+    """
+    一次性向量化解析 Gset 文件：首行为 "N E"，其后每行为 "u v w"（节点编号从 1 开始）
+    返回 (edges, weights, n_nodes, n_edges)，edges 为 (E, 2) 的 int64 数组，节点编号从 0 开始
+    """
+    with open(path, 'r') as f:
+        return parse_gset(f.read())
+
+def parse_gset(text):
+    # read_gset 的解析部分，输入为 Gset 文件的全部文本
+    values = np.array(text.split(), dtype=np.int64)
+    n_nodes = int(values[0])
+    triples = values[2:].reshape(-1, 3)
+
+    # 去掉自环和重复边（与 nx.Graph 的去重行为一致）
+    edges = np.sort(triples[:, :2] - 1, axis=1)
+    keep = edges[:, 0] != edges[:, 1]
+    edges, weights = edges[keep], triples[keep, 2]
+    edges, first = np.unique(edges, axis=0, return_index=True)
+    weights = weights[first]
+    return edges, weights, n_nodes, len(edges)
+
+def gset_edge_index(edges):
+    # 无向边对称化为 (2, 2E)，按 (row, col) 排序，与邻接矩阵 COO 的顺序一致
+    row = np.concatenate((edges[:, 0], edges[:, 1]))
+    col = np.concatenate((edges[:, 1], edges[:, 0]))
+    order = np.lexsort((col, row))
+    return np.vstack((row[order], col[order])).astype(np.int64)
+
+def load_gset(path, device=device1):
+    edges, weights, n_nodes, n_edges = read_gset(path)
+    edge_index = torch.from_numpy(gset_edge_index(edges)).to(device)
+    return edge_index, n_nodes, n_edges
+
 def get_edge_index(allRows):
+    # 旧的 networkx -> DGL 流程，仅为兼容保留；新代码请使用 load_gset / graph_cache.load_graph
+    import dgl
+    import networkx as nx
+    from networkx import convert_node_labels_to_integers
 
     G = nx.from_edgelist(allRows)
     G = convert_node_labels_to_integers(G, first_label=0, ordering="default", label_attribute=None)
@@ -0,0 +1,112 @@
+#GNN 取整之后的局部搜索：1-flip 贪心 + 禁忌搜索，直接在稀疏 QUBO 上进行
+#能量 E(x) = x^T Q x，记 S = Q_off + Q_off^T，局部场 h = S x，则翻转节点 i 的能量变化为 (1 - 2 x_i)(Q_ii + h_i)
+#每次翻转只需更新 i 的邻居的 h 和增益，代价为 O(degree)，不再重新计算 x^T Q x
+import numpy as np
+import scipy.sparse
+import torch
+
+def symmetric_qubo(Q):
+    """把 Q（scipy 稀疏矩阵、稠密张量或 (row, col, weight, diag) 元组）整理为 (S, diag)，S 为对称的 CSR"""
+    if isinstance(Q, tuple):
+        row, col, weight, diag = [t.detach().cpu().numpy() if isinstance(t, torch.Tensor) else np.asarray(t) for t in Q]
+        n = len(diag)
+    else:
+        if isinstance(Q, torch.Tensor):
+            Q = Q.detach().cpu().numpy()
+        Q = scipy.sparse.coo_matrix(Q)
+        n = Q.shape[0]
+        off = Q.row != Q.col
+        row, col, weight = Q.row[off], Q.col[off], Q.data[off]
+        diag = Q.diagonal()
+    upper = scipy.sparse.coo_matrix((np.asarray(weight, dtype=np.float64), (row, col)), shape=(n, n))
+    S = (upper + upper.T).tocsr()
+    S.sum_duplicates()
+    return S, np.asarray(diag, dtype=np.float64)
+
+def qubo_energy(S, diag, x):
+    x = np.asarray(x, dtype=np.float64)
+    return float(diag @ x + 0.5 * x @ (S @ x))
+
+def _neighbor_min(S, values):
+    # 每个节点邻居中 values 的最小值（没有邻居的节点为 +inf）；末尾补一个 inf 哨兵，空行的 reduceat 也落在哨兵上
+    gathered = np.append(values[S.indices], np.inf)
+    out = np.minimum.reduceat(gathered, S.indptr[:-1])
+    out[S.indptr[1:] == S.indptr[:-1]] = np.inf
+    return out
+
+def greedy_descent(S, diag, x, h=None):
+    """
+    向量化的 1-flip 贪心：每一轮同时翻转所有“在邻域内增益最优”的改进节点
+    这些节点两两不相邻，它们的能量变化可以直接相加；直到没有改进翻转为止
+    返回 (x, h, energy)
+    """
+    x = np.asarray(x, dtype=np.float64).copy()
+    h = S @ x if h is None else h
+    n = len(x)
+    while True:
+        gain = (1 - 2 * x) * (diag + h)
+        cand = gain < -1e-9
+        if not cand.any():
+            break
+        order = np.argsort(np.where(cand, gain, np.inf), kind='stable')
+        rank = np.empty(n)
+        rank[order] = np.arange(n)
+        rank[~cand] = np.inf
+        chosen = cand & (rank < _neighbor_min(S, rank))
+        delta = np.where(chosen, 1 - 2 * x, 0.)
+        x[chosen] = 1 - x[chosen]
+        h += S @ delta
+    return x, h, qubo_energy(S, diag, x)
+
+def tabu_search(S, diag, x, h=None, max_iters=10000, tenure=None, seed=None):
+    """
+    单点翻转禁忌搜索：每步选非禁忌（或满足特赦条件）的最优翻转，翻转后只更新邻居的局部场和增益
+    返回搜索过程中能量最低的 (x, energy)
+    """
+    rng = np.random.default_rng(seed)
+    x = np.asarray(x, dtype=np.float64).copy()
+    h = S @ x if h is None else h.copy()
+    n = len(x)
+    if tenure is None:
+        tenure = max(10, n // 100)
+    indptr, indices, data = S.indptr, S.indices, S.data
+
+    gain = (1 - 2 * x) * (diag + h)
+    energy = qubo_energy(S, diag, x)
+    best_energy, best_x = energy, x.copy()
+    tabu_until = np.zeros(n, dtype=np.int64)
+
+    for it in range(max_iters):
+        allowed = (tabu_until <= it) | (energy + gain < best_energy - 1e-9)
+        masked = np.where(allowed, gain, np.inf)
+        i = int(np.argmin(masked))
+        if not np.isfinite(masked[i]):
+            break
+        energy += gain[i]
+        delta = 1 - 2 * x[i]
+        x[i] = 1 - x[i]
+        gain[i] = -gain[i]
+        nbrs = indices[indptr[i]:indptr[i + 1]]
+        h[nbrs] += data[indptr[i]:indptr[i + 1]] * delta
+        gain[nbrs] = (1 - 2 * x[nbrs]) * (diag[nbrs] + h[nbrs])
+        tabu_until[i] = it + tenure + rng.integers(0, 3)
+
+        if energy < best_energy - 1e-9:
+            best_energy, best_x = energy, x.copy()
+
+    return best_x, best_energy
+
+def polish_bitstring(Q, bitstring, tabu_iters=10000, tenure=None, seed=None, S_diag=None):
+    """
+    对 GNN 取整得到的比特串做 贪心 + 禁忌 局部搜索，返回 (polished_bitstring, raw_energy, polished_energy)
+    最大割问题中割值 = -energy；S_diag 可传入 symmetric_qubo(Q) 的结果以便多次复用
+    """
+    S, diag = symmetric_qubo(Q) if S_diag is None else S_diag
+    if isinstance(bitstring, torch.Tensor):
+        bitstring = bitstring.detach().cpu().numpy()
+    x = np.asarray(bitstring, dtype=np.float64).reshape(-1)
+    raw_energy = qubo_energy(S, diag, x)
+    x, h, energy = greedy_descent(S, diag, x)
+    if tabu_iters > 0:
+        x, energy = tabu_search(S, diag, x, h, tabu_iters, tenure, seed)
+    return x.astype(np.int64), raw_energy, energy
@@ -2,6 +2,13 @@ from untils import main_prompt_word
 import re
 import openai
 from train_gnn import *
+from evaluator_pool import EvaluatorPool
+from result_cache import ResultCache
+from results_store import ResultsStore, graph_name
+from prompt_history import PromptHistory
+from supernet import get_acc_list_one_shot
+from warm_start import WeightBank
+from concurrent.futures import ThreadPoolExecutor
 import json
 import requests
 from fine_tune_llm.retrieval_qa import *
@@ -43,7 +50,6 @@ link_list = [
 
 model_path = '../LLM/model/Llama-3-8B-Instruct'
 lora_path = './llama3_finetune'
-tokenizer, model = pre_process(model_path, lora_path)
 prompt1 = '''The task is to provide some helpful graph neural network architectures based on a given dataset. \
 These architectures will be trained and tested on cora, and the architectures you provide should enable the model to achieve high accuracy.\n\
 The connection method of the architecture is as follows: The first operation is the input, the last operation is the output,\
@@ -51,7 +57,6 @@ and the middle operations are candidate operations. The adjacency matrix for the
 where the element (i,j) in the adjacency matrix indicates that the output of operation i will be used as the input for operation j.\n\
 There are nine candidate operations for the architecture: {{gcn, gat, sage, gin, cheb, arma, graph, fc, skip}}.\n\
 Please return some architecture models based on the GNN architecture and the relevant dataset I provided. Each model should contain four operations.'''
-response1 = llama3(prompt1, model, tokenizer)
 
 
 operation_dict = {'GCN': 'gcn', 'GAT': 'gat', 'GraphSAGE': 'sage', 'GIN': 'gin', 'ChebNet': 'cheb', 'ARMA': 'arma',
@@ -60,65 +65,160 @@ dataname = 'Gset published by stanford university which is related to graph theo
 system_content = '''Please pay special attention to my use of special markup symbols in the content below.The special markup symbols is # # ,and the content that needs special attention will be between #.'''
 # link have 9 chioces
 
-if __name__ == "__main__":
-    for link in link_list:
-        # 写入GNN宏观架构
-        with open("experiment.txt", "a") as file:
+# 同时搜索的 link 数；LLM 请求在各自线程里等待，训练任务共享同一个 EvaluatorPool 的 worker
+concurrency = 3
+iterations = 10
+# 设为整数（如 3）时用 successive halving 评估每批候选：低预算淘汰后只有前 1/halving_eta 继续训练
+halving_eta = None
+min_epochs = 500
+# 设为 0-100 的数（如 50）时先用零成本代理给候选排序，低于该分位数的候选推迟到下一轮与新候选一起重新排序
+proxy_percentile = None
+# 已训练过的架构（按图、link、操作、seed 和训练配置）直接复用 .result_cache 中的结果，跨进程重启有效
+use_result_cache = True
+# 设为整数（如 200）时启用 one-shot 模式：候选从按图缓存的 supernet 继承权重，只微调 one_shot_epochs 个 epoch
+one_shot_epochs = None
+# 设为整数（如 3000）时，exploitation 阶段的候选从最接近的已训练架构热启动，完全继承父代时只训练 warm_start_epochs 个 epoch，
+# 继承得越少预算越接近完整训练；与候选的汉明距离超过 warm_start_max_distance 的架构不作为父代，候选从头训练
+warm_start_epochs = None
+warm_start_max_distance = 2
+all_egdes = 4694  # the sum of egdes of G15
+# is_max_cut = False 时求解最大独立集：多个惩罚系数在一次批量训练中并行，结果修复为合法的独立集，acc 为独立集大小 / 节点数
+is_max_cut = True
+mis_penalties = [0.5, 1.0, 2.0, 4.0]
+all_nodes = 800  # the number of nodes of G14
+problem_kwargs = {} if is_max_cut else {'mis_penalties': mis_penalties}
+acc_denominator = all_egdes if is_max_cut else all_nodes
+# 结果写入该 SQLite 文件（见 results_store.py），prompt_source 为 'store' 时 prompt 的历史结果也从中查询；设为 None 时退回逐行追加的 experiment_*.txt
+results_db = "experiment.db"
+# prompt_source 为 'history' 时，prompt 中只保留最近一轮、更早轮次的前 prompt_top_k 个结果和其余结果的摘要，历史部分不超过 prompt_token_budget 个 token
+prompt_top_k = 20
+prompt_token_budget = 2000
+# prompt 中历史结果的来源：'history'（上面的 top_k + 摘要）、'store'（从 results_db 查询全部历史）或 'list'（内存中的 arch_list / acc_list）
+# 结果库总是用于保存结果，只有 'store' 时 prompt 才从中查询；results_db 为 None 时 'store' 退回 'list'
+prompt_source = 'history'
+
+
+def link_output_file(link):
+    # 每个 link 写自己的结果文件，并发搜索时无需加锁
+    return "experiment_{}.txt".format(''.join(map(str, link)))
+
+
+def search_link(link, pool=None, output_file=None, cache=None, store=None):
+    # store 为 ResultsStore 时结果只写入结果库，不再写文本文件
+    if output_file is None and store is None:
+        output_file = link_output_file(link)
+    graph = graph_name(graph_path)
+    # 写入GNN宏观架构
+    if output_file is not None:
+        with open(output_file, "a") as file:
             file.write(str(link) + "\n")
-        messages = [{"role": "system", "content": system_content + response1},
-                    {"role": "user", "content": main_prompt_word(link=tuple(link), dataname=dataname, stage=0)}, ]
+    messages = [{"role": "system", "content": system_content + response1},
+                {"role": "user", "content": main_prompt_word(link=tuple(link), dataname=dataname, stage=0)}, ]
+    arch_list = []
+    acc_history = []    #与 arch_list 一一对应的全部 acc，供 prompt_source = 'list' 使用
+    messages_history = []
+    deferred = []   #被代理推迟的 (operations_list_str, arch)
+    bank = WeightBank(link, warm_start_epochs, max_distance=warm_start_max_distance) if warm_start_epochs and is_max_cut else None
+    history = PromptHistory(link, prompt_top_k, prompt_token_budget) if prompt_source == 'history' else None
+    prompt_store = store if prompt_source == 'store' else None
+
+    for iteration in range(iterations):
+        if output_file is not None:
+            with open(output_file, "a") as file:
+                file.write("Epoch" + str(iteration) + "\n")
+        print(link, iteration)
+        option_list = []
+        new_archs = []
+
+        # 每次请求都用最新的 messages（上一轮结束时按结果重建的 prompt）构造 payload
         payload = {
             "model": 'gpt-4',
             "messages": messages,
             "temperature": 0
         }
-        all_egdes = 4694  # the sum of egdes of G15
-        arch_list = []
-        # acc_list = []
-        messages_history = []
-        iterations = 10
-
-        for iteration in range(iterations):
-            with open("experiment.txt", "a") as file:
-                file.write("Epoch" + str(iteration) + "\n")
-            print(iteration)
-            option_list = []
-
-            try:
-                response = requests.post(openai.api_base, headers=headers, data=json.dumps(payload))
-                response.raise_for_status()
-                res = response.json()
-                result_value = res['choices'][0]['message']['content']
-                print(result_value)
-            except (requests.HTTPError, json.JSONDecodeError) as err:
-                print("JSON parsing error:", err)
-            except Exception as err:
-                print("Other exceptions:", err)
-
-            messages.append(res)  # 直接在传入参数 messages 中追加消息
-            messages_history.append(messages)
-            # res_temp = res['content']
-            input_lst = re.split('Model:|model:', result_value)
-
-            for i in range(1, len(input_lst)):
-                operations_str = input_lst[i].split('[')[1].split(']')[0]
-                operations_list = operations_str.split(',')
-                # ['gcn', ' gat', ' sage', ' gin']
-                operations_list_str = [a.replace(" ", "") for a in operations_list]  # 获得去除了空格的列表
-
-                option_list.append(operations_list_str)
-                print(operations_list_str)
-                arch_list.append({'arch_Operations': operations_str})
-
-            acc_list = get_acc_list(link, all_egdes, option_list)
-
-            messages = [
-                {"role": "system", "content": system_content},
-                {"role": "user",
-                 "content": main_prompt_word(link=tuple(link), dataname=dataname, arch_list=arch_list,
-                                             acc_list=acc_list,
-                                             stage=iteration)},
-            ]
-            print(messages)
+        try:
+            response = requests.post(openai.api_base, headers=headers, data=json.dumps(payload))
+            response.raise_for_status()
+            res = response.json()
+            result_value = res['choices'][0]['message']['content']
+            print(result_value)
+        except (requests.HTTPError, json.JSONDecodeError) as err:
+            print("JSON parsing error:", err)
+            continue
+        except Exception as err:
+            print("Other exceptions:", err)
+            continue
+
+        messages.append(res['choices'][0]['message'])  # 直接在传入参数 messages 中追加消息
+        messages_history.append(messages)
+        # res_temp = res['content']
+        input_lst = re.split('Model:|model:', result_value)
+
+        for i in range(1, len(input_lst)):
+            operations_str = input_lst[i].split('[')[1].split(']')[0]
+            operations_list = operations_str.split(',')
+            # ['gcn', ' gat', ' sage', ' gin']
+            operations_list_str = [a.replace(" ", "") for a in operations_list]  # 获得去除了空格的列表
+
+            option_list.append(operations_list_str)
+            print(operations_list_str)
+            new_archs.append({'arch_Operations': operations_str})
+
+        if proxy_percentile is not None:
+            option_list = [ops for ops, arch in deferred] + option_list
+            new_archs = [arch for ops, arch in deferred] + new_archs
+            keep, defer, _ = rank_by_proxy(link, option_list, proxy_percentile)
+            deferred = [(option_list[i], new_archs[i]) for i in defer]
+            option_list = [option_list[i] for i in keep]
+            new_archs = [new_archs[i] for i in keep]
+        arch_list.extend(new_archs)
+
+        if one_shot_epochs and is_max_cut:   #supernet 和热启动目前只针对最大割训练
+            acc_list = get_acc_list_one_shot(link, all_egdes, option_list, link_list, output_file=output_file,
+                                             finetune_epochs=one_shot_epochs, store=store, iteration=iteration,
+                                             cache=cache)
+        elif halving_eta:
+            acc_list, fidelity_list = get_acc_list_halving(link, acc_denominator, option_list, pool=pool,
+                                                           output_file=output_file, eta=halving_eta,
+                                                           min_epochs=min_epochs, cache=cache, store=store,
+                                                           iteration=iteration, **problem_kwargs)
+            # 低保真度的结果在 prompt 中单独标注（见 untils.experiments_prompt）
+            for arch, fidelity in zip(arch_list[-len(option_list):], fidelity_list):
+                arch['fidelity'] = fidelity
+        else:
+            # 第 iteration 轮的候选来自上一轮以 stage=iteration-1 构造的 prompt，stage >= 4 为 exploitation 阶段
+            acc_list = get_acc_list(link, acc_denominator, option_list, pool=pool, output_file=output_file, cache=cache,
+                                    bank=bank, warm_start=iteration - 1 >= 4, store=store, iteration=iteration,
+                                    **problem_kwargs)
+
+        acc_history.extend(acc_list)
+        if history is not None:
+            history.add_round(new_archs, acc_list)
+
+        messages = [
+            {"role": "system", "content": system_content},
+            {"role": "user",
+             "content": main_prompt_word(link=tuple(link), dataname=dataname, arch_list=arch_list,
+                                         acc_list=acc_history,
+                                         stage=iteration, store=prompt_store, graph=graph, history=history)},
+        ]
+        print(messages)
+
+    return arch_list, acc_history
+
+
+def search_all_links(links, pool=None, concurrency=concurrency, cache=None, store=None):
+    # 多个 link 的搜索相互独立：用线程交错它们的 LLM 请求和训练任务，训练本身在进程池里并行
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(lambda link: search_link(link, pool, cache=cache, store=store), links))
 
 
+if __name__ == "__main__":
+    # 只在主进程加载 LLM：EvaluatorPool 的 spawn 子进程会重新导入本模块
+    tokenizer, model = pre_process(model_path, lora_path)
+    response1 = llama3(prompt1, model, tokenizer)
+
+    with EvaluatorPool(graph_path, **problem_kwargs) as pool:
+        cache = ResultCache() if use_result_cache else None
+        store = ResultsStore(results_db) if results_db else None
+        search_all_links(link_list, pool, concurrency, cache, store)
@@ -0,0 +1,89 @@
+#最大独立集（MIS）的原生路径：稀疏 QUBO、多个惩罚系数各训练一个模型、基于 CSR 邻接的向量化修复
+#QUBO H = -sum_u x_u + penalty * sum_{(u,v)} x_u x_v 与最大割共享同一组边，只是对角为 -1、边权为 penalty
+#GNN 取整后的比特串不保证独立：先按度数从大到小删去冲突节点，再按度数从小到大贪心加入空闲节点
+import numpy as np
+import scipy.sparse
+import torch
+from local_search import _neighbor_min
+
+def mis_qubo_batch(Q, penalties):
+    """
+    由 qubo_edge_list 得到的 (row, col, weight, diag)（最大割或 MIS 的均可，只取其中的边）构造 K 个惩罚系数的 MIS QUBO
+    返回 (row, col, weight, diag)，weight 形状为 (K, E)，可直接配合 (K, N) 的概率使用 co_corefunc.loss_func
+    """
+    row, col, weight, diag = Q
+    penalties = torch.as_tensor(penalties, dtype=weight.dtype, device=weight.device).view(-1, 1)
+    return row, col, penalties.expand(-1, row.numel()).contiguous(), -torch.ones_like(diag)
+
+def qubo_slice(Q, k):
+    # mis_qubo_batch 结果中第 k 个惩罚系数对应的单个 QUBO
+    row, col, weight, diag = Q
+    return row, col, weight[k], diag
+
+def adjacency(Q, n_nodes=None):
+    # 由 (row, col, ...) 或稀疏 Q 的非对角元得到对称的 CSR 邻接矩阵（numpy / scipy）
+    if isinstance(Q, tuple):
+        row, col = [t.detach().cpu().numpy() if isinstance(t, torch.Tensor) else np.asarray(t) for t in Q[:2]]
+        n_nodes = len(Q[3]) if n_nodes is None else n_nodes
+    else:
+        Q = scipy.sparse.coo_matrix(Q)
+        off = Q.row != Q.col
+        row, col, n_nodes = Q.row[off], Q.col[off], Q.shape[0]
+    upper = scipy.sparse.coo_matrix((np.ones(len(row)), (row, col)), shape=(n_nodes, n_nodes))
+    A = (upper + upper.T).tocsr()
+    A.data[:] = 1
+    return A
+
+def _priority_rank(key, mask):
+    # 把 key 在 mask 内的节点排成 0..k-1（key 相同时按编号），mask 外为 inf
+    n = len(key)
+    order = np.lexsort((np.arange(n), np.where(mask, key, np.inf)))
+    rank = np.empty(n)
+    rank[order] = np.arange(n)
+    rank[~mask] = np.inf
+    return rank
+
+def remove_conflicts(A, x, deg=None):
+    """
+    每一轮同时删去所有“在冲突邻居中优先级最高”的冲突节点，优先级为 (冲突数, 度数) 从大到小
+    被删的节点两两不相邻，每一轮至少消除一个冲突，直到选中的节点两两不相邻
+    """
+    x = np.asarray(x, dtype=np.float64).reshape(-1).copy()
+    deg = np.asarray(A.sum(axis=1)).reshape(-1) if deg is None else deg
+    while True:
+        conflicts = (A @ x) * x
+        cand = conflicts > 0
+        if not cand.any():
+            break
+        # 负号：_neighbor_min 找的是最小值，rank 越小优先级越高
+        rank = _priority_rank(-(conflicts * (deg.max() + 1) + deg), cand)
+        x[cand & (rank < _neighbor_min(A, rank))] = 0
+    return x
+
+def greedy_fill(A, x, deg=None):
+    # 每一轮同时加入所有“在空闲邻居中度数最小”的空闲节点，加入的节点两两不相邻，直到没有空闲节点
+    x = np.asarray(x, dtype=np.float64).reshape(-1).copy()
+    deg = np.asarray(A.sum(axis=1)).reshape(-1) if deg is None else deg
+    while True:
+        free = (x == 0) & ((A @ x) == 0)
+        if not free.any():
+            break
+        rank = _priority_rank(deg, free)
+        x[free & (rank < _neighbor_min(A, rank))] = 1
+    return x
+
+def repair_independent_set(A, bitstring):
+    """
+    把任意比特串修复为极大独立集，返回 (repaired, conflict_free)
+    conflict_free 只删去了冲突节点，repaired 在其基础上贪心加满；两者都是 int64 的 0/1 数组
+    """
+    if isinstance(bitstring, torch.Tensor):
+        bitstring = bitstring.detach().cpu().numpy()
+    deg = np.asarray(A.sum(axis=1)).reshape(-1)
+    conflict_free = remove_conflicts(A, bitstring, deg)
+    repaired = greedy_fill(A, conflict_free, deg)
+    return repaired.astype(np.int64), conflict_free.astype(np.int64)
+
+def is_independent(A, x):
+    x = np.asarray(x, dtype=np.float64).reshape(-1)
+    return float(x @ (A @ x)) == 0
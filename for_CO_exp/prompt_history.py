@@ -0,0 +1,122 @@
+#增量维护的 prompt 历史：每个 link 一个 PromptHistory，每轮结果加入时只做 O(log k) 的堆操作和 O(1) 的集合查找
+#prompt 只包含最近一轮、更早轮次中 acc 最高的 top_k 个和其余结果的压缩摘要，并按 token 预算截断，长度不随迭代次数增长
+import heapq
+from canonical import canonical_ops
+
+chars_per_token = 4     #粗略的 token 估计：英文 prompt 平均每 token 约 4 个字符
+
+def estimate_tokens(text):
+    return (len(text) + chars_per_token - 1) // chars_per_token
+
+def parse_ops(arch_operations):
+    # 'gcn, gat,sage , gin' -> ['gcn', 'gat', 'sage', 'gin']
+    return [op.strip() for op in arch_operations.split(',')]
+
+class PromptHistory(object):
+    """
+    top:        更早轮次中 acc 最高的 top_k 个 (acc, -seq, arch) 组成的小根堆，被挤出的结果只计入摘要
+    last_round: 最近一轮的 [(arch, acc), ...]，下一轮加入时整体并入 top
+    seen:       按 link 自同构规范化后的操作元组（见 canonical.canonical_ops），用于发现重复提出的架构
+    摘要统计全部结果的 acc 范围和每种操作的平均 acc；token_budget 限制历史部分（最近一轮、top_k、重复、摘要）的估计 token 数
+    """
+    def __init__(self, link, top_k=20, token_budget=2000):
+        self.link = list(link)
+        self.top_k = top_k
+        self.token_budget = token_budget
+        self.top = []
+        self.last_round = []
+        self.seen = set()
+        self.repeats = []
+        self._repeat_set = set()
+        self._seq = 0
+        self.count = 0
+        self.rest_count = 0
+        self.rest_sum = 0.
+        self.rest_min = None
+        self.rest_max = None
+        self.op_stats = {}      #op -> [包含该操作的模型数, 这些模型的 acc 之和]
+
+    def _push(self, arch, acc):
+        entry = (acc, -self._seq, arch)
+        self._seq += 1
+        if len(self.top) < self.top_k:
+            heapq.heappush(self.top, entry)
+            return
+        evicted = heapq.heappushpop(self.top, entry)
+        self.rest_count += 1
+        self.rest_sum += evicted[0]
+        self.rest_min = evicted[0] if self.rest_min is None else min(self.rest_min, evicted[0])
+        self.rest_max = evicted[0] if self.rest_max is None else max(self.rest_max, evicted[0])
+
+    def add_round(self, arch_list, acc_list):
+        # arch 为 main.py 中的 {'arch_Operations': ..., 'fidelity': ...}；上一轮并入 top，这一轮成为 last_round
+        for arch, acc in self.last_round:
+            self._push(arch, acc)
+        self.last_round = list(zip(arch_list, acc_list))
+        for arch, acc in self.last_round:
+            ops = parse_ops(arch['arch_Operations'])
+            key = tuple(canonical_ops(self.link, ops)) if len(ops) == len(self.link) else tuple(ops)
+            if key in self.seen:
+                if key not in self._repeat_set:
+                    self._repeat_set.add(key)
+                    self.repeats.append(arch['arch_Operations'])
+            else:
+                self.seen.add(key)
+            for op in set(ops):
+                stats = self.op_stats.setdefault(op, [0, 0.])
+                stats[0] += 1
+                stats[1] += acc
+            self.count += 1
+
+    def is_seen(self, option_list):
+        return tuple(canonical_ops(self.link, option_list)) in self.seen
+
+    def sorted_top(self):
+        # top 按 acc 从高到低（相同时先加入的在前），k 固定，排序代价与历史长度无关
+        return [(arch, acc) for acc, neg_seq, arch in sorted(self.top, key=lambda e: (e[0], e[1]), reverse=True)]
+
+    def summary(self, dropped=()):
+        # dropped 为因 token 预算从 top 中去掉的 acc，与被挤出 top 的结果一起计入摘要
+        count = self.rest_count + len(dropped)
+        lines = []
+        if count > 0:
+            low = min([a for a in (self.rest_min,) if a is not None] + list(dropped))
+            high = max([a for a in (self.rest_max,) if a is not None] + list(dropped))
+            mean = (self.rest_sum + sum(dropped)) / count
+            lines.append('There are also {} other models with accuracy between {:.4f} and {:.4f} (mean {:.4f}).\n'
+                         .format(count, low, high, mean))
+        if self.op_stats:
+            ranked = sorted(self.op_stats.items(), key=lambda item: item[1][1] / item[1][0], reverse=True)
+            lines.append('Average accuracy of the models containing each operation: {}.\n'.format(', '.join(
+                '{} {:.4f} ({} models)'.format(op, total / n, n) for op, (n, total) in ranked)))
+        return ''.join(lines)
+
+    def sections(self, line_fn):
+        """
+        返回 (last_round, sorted_results, repeats, summary)，供 untils._format_experiments_prompt 使用
+        超出 token_budget 时依次从 top 的末尾去掉结果（计入摘要），再截短重复列表；最近一轮总是保留
+        line_fn 为 untils.result_line，用于估计每一行的 token 数
+        """
+        sorted_results = self.sorted_top()
+        repeats = list(self.repeats)
+        used = sum(estimate_tokens(line_fn(arch, acc)) for arch, acc in self.last_round)
+        top_tokens = [estimate_tokens(line_fn(arch, acc)) for arch, acc in sorted_results]
+        repeat_tokens = [estimate_tokens('Model [{}]\n'.format(arch)) for arch in repeats]
+        budget = float('inf') if self.token_budget is None else self.token_budget
+
+        dropped = []
+        while True:
+            summary = self.summary(dropped)
+            total = used + sum(top_tokens) + sum(repeat_tokens) + estimate_tokens(summary)
+            if total <= budget:
+                break
+            if sorted_results:
+                arch, acc = sorted_results.pop()
+                top_tokens.pop()
+                dropped.append(acc)
+            elif repeats:
+                repeats.pop()
+                repeat_tokens.pop()
+            else:
+                break
+        return self.last_round, sorted_results, repeats, summary
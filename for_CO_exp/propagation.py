@@ -0,0 +1,128 @@
+#每张图共享的传播缓存：GCN 归一化边权、ARMA / Cheb 的归一化与缩放拉普拉斯边权、GraphConv 的 CSR 邻接只计算一次
+#CO 训练中图是静态的，PyG 的 GCNConv / ChebConv / ARMAConv 默认每次前向都重新加自环、算度数和拉普拉斯，一个候选要重复 15000 次
+#Cached* 算子与对应的 PyG 算子参数完全相同（state_dict 键名一致），只是从缓存里取传播所需的边权
+import weakref
+import torch
+import torch.nn.functional as F
+from torch_geometric.nn import GCNConv, ChebConv, ARMAConv, GraphConv
+
+_caches = {}    #id(edge_index) -> PropagationCache，edge_index 被释放时自动移除
+
+class PropagationCache(object):
+    """
+    gcn:  (带自环的 edge_index, D^-1/2 (A + I) D^-1/2 的边权)
+    sym:  (edge_index, D^-1/2 A D^-1/2 的边权)，ARMAConv 使用
+    cheb: (edge_index, 缩放拉普拉斯 2L / lambda_max - I 的边权)，normalization='sym'、lambda_max=2 时即 -sym，自环权重为 0 故省略
+    adj_t: 以目标节点为行的 CSR 邻接矩阵，GraphConv 的求和聚合直接做 spmm
+    """
+    def __init__(self, edge_index, num_nodes):
+        row, col = edge_index[0], edge_index[1]
+        keep = row != col
+        row, col = row[keep], col[keep]
+        device = edge_index.device
+        ones = torch.ones(row.numel(), device=device)
+
+        deg = torch.zeros(num_nodes, device=device).index_add_(0, col, ones)
+        deg_inv_sqrt = deg.pow(-0.5)
+        deg_inv_sqrt[torch.isinf(deg_inv_sqrt)] = 0
+        sym_weight = deg_inv_sqrt[row] * deg_inv_sqrt[col]
+        self.sym = (torch.stack((row, col)), sym_weight)
+        self.cheb = (self.sym[0], -sym_weight)
+
+        loops = torch.arange(num_nodes, device=device)
+        deg_hat_inv_sqrt = (deg + 1).pow(-0.5)
+        gcn_index = torch.stack((torch.cat((row, loops)), torch.cat((col, loops))))
+        gcn_weight = deg_hat_inv_sqrt[gcn_index[0]] * deg_hat_inv_sqrt[gcn_index[1]]
+        self.gcn = (gcn_index, gcn_weight)
+
+        self.adj_t = torch.sparse_coo_tensor(torch.stack((col, row)), ones, (num_nodes, num_nodes)).coalesce() \
+            .to_sparse_csr()
+        self.num_nodes = num_nodes
+
+def propagation_cache(edge_index, num_nodes):
+    # 同一个 edge_index 张量只构造一次缓存；训练循环每个 epoch 都传入同一个 data.edge_index
+    key = id(edge_index)
+    cache = _caches.get(key)
+    if cache is None or cache.num_nodes != num_nodes:
+        cache = PropagationCache(edge_index, num_nodes)
+        _caches[key] = cache
+        weakref.finalize(edge_index, _caches.pop, key, None)
+    return cache
+
+class CachedGCNConv(GCNConv):
+    def __init__(self, in_channels, out_channels, **kwargs):
+        super(CachedGCNConv, self).__init__(in_channels, out_channels, normalize=False, **kwargs)
+
+    def forward(self, x, edge_index, edge_weight=None):
+        edge_index, edge_weight = propagation_cache(edge_index, x.size(0)).gcn
+        return super(CachedGCNConv, self).forward(x, edge_index, edge_weight)
+
+class CachedChebConv(ChebConv):
+    # ChebConv.forward 通过 __norm__ 得到缩放拉普拉斯，这里直接返回缓存（只支持默认的 normalization='sym'）
+    def __norm__(self, edge_index, num_nodes, edge_weight, *args, **kwargs):
+        return propagation_cache(edge_index, num_nodes).cheb
+
+class CachedARMAConv(ARMAConv):
+    # 与 ARMAConv.forward 相同，只是跳过每次前向的 gcn_norm
+    def forward(self, x, edge_index, edge_weight=None):
+        edge_index, edge_weight = propagation_cache(edge_index, x.size(0)).sym
+        x = x.unsqueeze(-3)
+        out = x
+        for t in range(self.num_layers):
+            if t == 0:
+                out = out @ self.init_weight
+            else:
+                out = out @ self.weight[0 if self.shared_weights else t - 1]
+            out = self.propagate(edge_index, x=out, edge_weight=edge_weight, size=None)
+            root = F.dropout(x, p=self.dropout, training=self.training)
+            root = root @ self.root_weight[0 if self.shared_weights else t]
+            out = out + root
+            if self.bias is not None:
+                out = out + self.bias[0 if self.shared_weights else t]
+            if self.act is not None:
+                out = self.act(out)
+        return out.mean(dim=-3)
+
+class CachedGraphConv(GraphConv):
+    # 求和聚合改为缓存的 CSR 邻接上的 spmm
+    def forward(self, x, edge_index, edge_weight=None):
+        return super(CachedGraphConv, self).forward(x, propagation_cache(edge_index, x.size(0)).adj_t)
+
+def benchmark(graph_file, n_epochs=200, in_features=369, hidden_dim=5):
+    """
+    微基准：同一张图上分别用 PyG 原始算子和 Cached* 算子做 n_epochs 次前向 + 反向，打印每个 epoch 的平均耗时（毫秒）
+    python propagation.py ../G14.txt
+    """
+    from time import time
+    from graph_cache import load_graph
+
+    edge_index, n_nodes, n_edges, Q = load_graph(graph_file)
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    edge_index = torch.tensor(edge_index, dtype=torch.long, device=device)
+    x = torch.randn(n_nodes, in_features, device=device)
+    pairs = {
+        'gcn': (GCNConv, CachedGCNConv, ()),
+        'cheb': (ChebConv, CachedChebConv, (2,)),
+        'arma': (ARMAConv, CachedARMAConv, ()),
+        'graph': (GraphConv, CachedGraphConv, ()),
+    }
+    for name, (plain, cached, args) in pairs.items():
+        timings = []
+        for cls in (plain, cached):
+            torch.manual_seed(0)
+            conv = cls(in_features, hidden_dim, *args).to(device)
+            conv(x, edge_index).sum().backward()    #预热，Cached* 在这里建立缓存
+            if device.type == 'cuda':
+                torch.cuda.synchronize()
+            start = time()
+            for _ in range(n_epochs):
+                conv.zero_grad()
+                conv(x, edge_index).sum().backward()
+            if device.type == 'cuda':
+                torch.cuda.synchronize()
+            timings.append((time() - start) / n_epochs * 1000)
+        print(f'{name}: {timings[0]:.3f} ms/epoch -> {timings[1]:.3f} ms/epoch ({timings[0] / timings[1]:.2f}x)')
+
+if __name__ == "__main__":
+    import sys
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else "../G14.txt")
@@ -0,0 +1,73 @@
+#零成本代理：在初始化附近只做几步前向/反向，给候选架构打分，用于训练前的预排序
+#梯度范数、SynFlow 显著性、初始 QUBO 损失及其前几步的下降斜率，各自排名后取平均
+import numpy as np
+import torch
+import create_gnn
+from co_corefunc import loss_func
+from torch_geometric.data import Data
+
+def _synflow(net, data):
+    # SynFlow：参数取绝对值、输入全 1，R = sum(output)，分数为 sum |theta * dR/dtheta|；结束后恢复参数符号
+    signs = {}
+    with torch.no_grad():
+        for name, p in net.state_dict().items():
+            signs[name] = torch.sign(p)
+            p.abs_()
+    net.zero_grad()
+    ones = Data(x=torch.ones_like(data.x), edge_index=data.edge_index)
+    net(ones).sum().backward()
+    score = sum((p * p.grad).abs().sum().item() for p in net.parameters() if p.grad is not None)
+    with torch.no_grad():
+        for name, p in net.state_dict().items():
+            p.mul_(signs[name])
+    net.zero_grad()
+    return score
+
+def proxy_scores(model, edge_index, n_nodes, Q, in_features=369, n_steps=5):
+    """
+    对一个候选架构返回 {'grad_norm', 'synflow', 'init_loss', 'loss_slope'}
+    model 为 train_gnn.get_MyGNN 返回的构造函数；Q 可以是稠密 Q 或 (row, col, weight, diag)
+    loss_slope 为前 n_steps 步 Adam 更新中每步的平均损失变化（越负越好）
+    """
+    net, embed, optimizer = create_gnn.get_gnn_params(in_features, 1, n_nodes, model)
+    data = Data(x=embed.weight, edge_index=edge_index)
+
+    synflow = _synflow(net, data)
+
+    losses = []
+    grad_norm = 0.
+    for step in range(max(1, n_steps)):
+        probs = net(data)[:, 0]
+        loss = loss_func(probs, Q)
+        optimizer.zero_grad()
+        loss.backward()
+        if step == 0:
+            grad_norm = sum(p.grad.norm().item() ** 2 for p in net.parameters() if p.grad is not None) ** 0.5
+        optimizer.step()
+        losses.append(loss.item())
+
+    slope = (losses[-1] - losses[0]) / max(1, len(losses) - 1)
+    return {'grad_norm': grad_norm, 'synflow': synflow, 'init_loss': losses[0], 'loss_slope': slope}
+
+def combine_scores(scores):
+    """
+    把每个候选的代理指标在候选之间排名后取平均，返回 (K,) 的综合分数（越大越好）
+    梯度范数和 SynFlow 越大越好，初始损失和斜率越小越好
+    """
+    higher_better = {'grad_norm': 1., 'synflow': 1., 'init_loss': -1., 'loss_slope': -1.}
+    ranks = []
+    for key, sign in higher_better.items():
+        values = sign * np.array([s[key] for s in scores], dtype=np.float64)
+        values[~np.isfinite(values)] = -np.inf
+        ranks.append(np.argsort(np.argsort(values, kind='stable'), kind='stable'))
+    return np.mean(ranks, axis=0)
+
+def split_by_percentile(combined, percentile):
+    # 返回 (保留的下标, 推迟的下标)：综合分数低于 percentile 分位数的候选被推迟，至少保留一个
+    combined = np.asarray(combined, dtype=np.float64)
+    cutoff = np.percentile(combined, percentile)
+    keep = [i for i in range(len(combined)) if combined[i] >= cutoff]
+    if not keep:
+        keep = [int(np.argmax(combined))]
+    deferred = [i for i in range(len(combined)) if i not in keep]
+    return keep, deferred
@@ -0,0 +1,70 @@
+#架构结果的磁盘缓存：按 (图内容哈希, link, 操作列表, seed, 训练配置) 保存割值、最优比特串和训练耗时
+#LLM 重复提出的架构直接返回缓存结果，跨迭代、跨 link、跨进程重启都有效
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+from graph_cache import file_hash
+
+cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".result_cache")
+cache_version = 1   #训练流程或结果格式变化时加一，旧缓存自动失效
+
+_graph_hashes = {}
+
+def graph_hash(path):
+    # 同一进程内每个图文件只哈希一次
+    key = os.path.abspath(path)
+    if key not in _graph_hashes:
+        _graph_hashes[key] = file_hash(path)
+    return _graph_hashes[key]
+
+def result_key(graph_file, link, option_list, seed=None, config=None):
+    # config 为训练配置（train_candidate 的参数及 create_gnn 的超参数），按键排序后参与哈希
+    payload = json.dumps({'version': cache_version, 'graph': graph_hash(graph_file), 'link': list(link),
+                          'ops': list(option_list), 'seed': seed, 'config': config or {}},
+                         sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+class ResultCache(object):
+    """
+    每个结果存为 <key>.json（cut、raw_cut、wall_time 等）和 <key>.npy（最优比特串），写入时先写临时文件再原子替换
+    get 返回 (cut, best_bitstring, raw_cut, wall_time)，未命中返回 None
+    """
+    def __init__(self, cache_dir=cache_dir):
+        self.cache_dir = cache_dir
+        self._memory = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key, ext):
+        return os.path.join(self.cache_dir, key + ext)
+
+    def get(self, key):
+        if key in self._memory:
+            return self._memory[key]
+        meta_file = self._path(key, ".json")
+        if not os.path.exists(meta_file):
+            return None
+        with open(meta_file, 'r') as f:
+            meta = json.load(f)
+        bitstring = np.load(self._path(key, ".npy"))
+        entry = (meta['cut'], bitstring, meta['raw_cut'], meta['wall_time'])
+        self._memory[key] = entry
+        return entry
+
+    def put(self, key, cut, best_bitstring, raw_cut, wall_time, **info):
+        # info（link、ops 等）只写进 json 便于查看，不参与查找
+        bitstring = np.array([int(b) for b in best_bitstring], dtype=np.int8)
+        suffix = "{}.{}".format(os.getpid(), threading.get_ident())   #并发的 link 线程可能同时写同一个键
+        tmp = self._path(key, ".{}.tmp.npy".format(suffix))
+        np.save(tmp, bitstring)
+        os.replace(tmp, self._path(key, ".npy"))
+        meta = dict(info, cut=float(cut), raw_cut=float(raw_cut), wall_time=float(wall_time))
+        tmp = self._path(key, ".json.{}.tmp".format(suffix))
+        with open(tmp, 'w') as f:
+            json.dump(meta, f, default=str)
+        os.replace(tmp, self._path(key, ".json"))
+        self._memory[key] = (float(cut), bitstring, float(raw_cut), float(wall_time))
+
+    def __contains__(self, key):
+        return self.get(key) is not None
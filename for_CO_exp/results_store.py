@@ -0,0 +1,133 @@
+#结构化的搜索结果库：嵌入式 SQLite 文件，取代逐行追加的 experiment_*.txt
+#每个候选一行 (run, graph, link, ops, iteration, acc, cut, raw_cut, fidelity, method)，(run, graph, link, ops, iteration) 和
+#(run, graph, link, acc) 上建索引：每批候选一次事务批量写入，prompt 所需的排序历史、最近一轮和重复架构各是一次索引查询
+#run 区分同一个文件里的多次搜索；进程崩溃后结果仍在文件里，用相同的 run 重新打开即可继续，也可直接用 sqlite3 命令行查询，例如
+#    sqlite3 experiment.db "SELECT run, link, ops, acc FROM results WHERE graph='G14' ORDER BY acc DESC LIMIT 10"
+import os
+import sqlite3
+import threading
+from time import time, strftime
+
+schema = '''
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run TEXT NOT NULL,
+    graph TEXT NOT NULL,
+    link TEXT NOT NULL,
+    ops TEXT NOT NULL,
+    iteration INTEGER NOT NULL,
+    acc REAL NOT NULL,
+    cut REAL,
+    raw_cut REAL,
+    fidelity REAL NOT NULL DEFAULT 1.0,
+    method TEXT,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_key ON results (run, graph, link, ops, iteration);
+CREATE INDEX IF NOT EXISTS idx_results_acc ON results (run, graph, link, acc DESC);
+'''
+
+def graph_name(path):
+    # 结果库中的图名取文件名去掉扩展名（"../G14.txt" -> "G14"），便于直接查询
+    return os.path.splitext(os.path.basename(path))[0]
+
+def link_key(link):
+    return ''.join(map(str, link))
+
+def ops_key(option_list):
+    # 操作列表统一存成去掉空格、逗号分隔的字符串
+    return ','.join(op.strip() for op in option_list)
+
+class ResultsStore(object):
+    """
+    SQLite 结果库，并发搜索的每个 link 线程各用一条连接（WAL 模式下读写互不阻塞）
+    写入和查询都限定在 run 内，run 默认为打开时的时间戳；查询结果以 (arch, acc) 返回，
+    arch 为 {'arch_Operations': ..., 'fidelity': ...}，与 untils.result_line 的输入一致
+    """
+    def __init__(self, path="experiment.db", run=None):
+        self.path = path
+        self.run = run if run is not None else strftime("%Y%m%d-%H%M%S")
+        self._local = threading.local()
+        self._connect().executescript(schema)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def add_batch(self, graph, link, iteration, option_list, acc_list, cuts=None, raw_cuts=None, fidelities=None,
+                  method=None):
+        # 一批候选在一个事务里写入；cuts / raw_cuts / fidelities 为 None 时对应列留空（fidelity 记为 1.0）
+        n = len(option_list)
+        cuts = cuts if cuts is not None else [None] * n
+        raw_cuts = raw_cuts if raw_cuts is not None else [None] * n
+        fidelities = fidelities if fidelities is not None else [1.0] * n
+        now = time()
+        rows = [(self.run, graph, link_key(link), ops_key(ops), iteration, float(acc), cut, raw_cut, float(fidelity),
+                 method, now)
+                for ops, acc, cut, raw_cut, fidelity in zip(option_list, acc_list, cuts, raw_cuts, fidelities)]
+        conn = self._connect()
+        with conn:
+            conn.executemany('INSERT INTO results (run, graph, link, ops, iteration, acc, cut, raw_cut, fidelity, '
+                             'method, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def _query(self, sql, args):
+        return self._connect().execute(sql, args).fetchall()
+
+    @staticmethod
+    def _arch(ops, fidelity):
+        return {'arch_Operations': ops.replace(',', ', '), 'fidelity': fidelity}
+
+    def count(self, graph, link):
+        return self._query('SELECT COUNT(*) FROM results WHERE run = ? AND graph = ? AND link = ?',
+                           (self.run, graph, link_key(link)))[0][0]
+
+    def latest_iteration(self, graph, link):
+        # 没有结果时返回 None
+        return self._query('SELECT MAX(iteration) FROM results WHERE run = ? AND graph = ? AND link = ?',
+                           (self.run, graph, link_key(link)))[0][0]
+
+    def round_results(self, graph, link, iteration):
+        # 某一轮的结果，按写入顺序
+        rows = self._query('SELECT ops, acc, fidelity FROM results WHERE run = ? AND graph = ? AND link = ? '
+                           'AND iteration = ? ORDER BY id', (self.run, graph, link_key(link), iteration))
+        return [(self._arch(ops, fidelity), acc) for ops, acc, fidelity in rows]
+
+    def history(self, graph, link):
+        # 全部结果，按写入顺序
+        rows = self._query('SELECT ops, acc, fidelity FROM results WHERE run = ? AND graph = ? AND link = ? '
+                           'ORDER BY id', (self.run, graph, link_key(link)))
+        return [(self._arch(ops, fidelity), acc) for ops, acc, fidelity in rows]
+
+    def top_k(self, graph, link, k=None, before_iteration=None):
+        # 按 acc 从高到低的前 k 个结果（k 为 None 时返回全部），before_iteration 只取更早的轮次
+        sql = 'SELECT ops, acc, fidelity FROM results WHERE run = ? AND graph = ? AND link = ?'
+        args = [self.run, graph, link_key(link)]
+        if before_iteration is not None:
+            sql += ' AND iteration < ?'
+            args.append(before_iteration)
+        sql += ' ORDER BY acc DESC, id LIMIT ?'
+        args.append(-1 if k is None else k)
+        rows = self._query(sql, args)
+        return [(self._arch(ops, fidelity), acc) for ops, acc, fidelity in rows]
+
+    def best(self, graph, link, option_list):
+        # 该架构历史上的最好 acc，从未评估过时返回 None
+        return self._query('SELECT MAX(acc) FROM results WHERE run = ? AND graph = ? AND link = ? AND ops = ?',
+                           (self.run, graph, link_key(link), ops_key(option_list)))[0][0]
+
+    def repeats(self, graph, link):
+        # 被评估过不止一次的架构，按第一次出现的顺序
+        rows = self._query('SELECT ops FROM results WHERE run = ? AND graph = ? AND link = ? GROUP BY ops '
+                           'HAVING COUNT(*) > 1 ORDER BY MIN(id)', (self.run, graph, link_key(link)))
+        return [ops.replace(',', ', ') for ops, in rows]
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
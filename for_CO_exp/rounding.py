@@ -0,0 +1,45 @@
+#批量随机取整：从 GNN 输出的概率一次性采样 M 个比特串（伯努利采样 + 阈值扫描），按边 gather 批量计算 QUBO 能量并取最优
+#只依赖 torch，可以被 create_gnn 和 llm4gnas 的 COTrainer 共同使用
+import torch
+
+default_thresholds = torch.linspace(0.05, 0.95, 19)
+max_chunk_elements = 1 << 24    #chunk_size 为 None 时，每块 gather 的元素数（M_chunk * E）上限，约 64MB 的 float32
+
+def sample_bitstrings(probs, n_samples=64, thresholds=None, generator=None):
+    # 返回 (len(thresholds) + n_samples, N) 的候选比特串，前几行是阈值扫描（含 0.5），其余为伯努利采样
+    probs = probs.detach().reshape(-1)
+    if thresholds is None:
+        thresholds = default_thresholds
+    thresholds = torch.as_tensor(thresholds, dtype=probs.dtype, device=probs.device)
+    sweep = (probs.unsqueeze(0) >= thresholds.unsqueeze(1)).type(probs.dtype)
+    if n_samples <= 0:
+        return sweep
+    samples = torch.bernoulli(probs.clamp(0, 1).expand(n_samples, -1), generator=generator)
+    return torch.cat((sweep, samples), dim=0)
+
+def qubo_energies(bitstrings, Q, chunk_size=None):
+    """
+    批量计算 x^T Q x，bitstrings 为 (M, N)，返回 (M,)
+    Q 为 (row, col, weight, diag) 时按边 gather，复杂度 O(M * E)；按 chunk_size 分块以限制显存/内存
+    chunk_size 为 None 时按边数自动选择，使每块的中间张量不超过 max_chunk_elements 个元素（大图时每块只有几个比特串）
+    """
+    if chunk_size is None:
+        n_terms = Q[0].numel() if isinstance(Q, tuple) else Q.shape[0] * Q.shape[1]
+        chunk_size = max(1, max_chunk_elements // max(1, n_terms))
+    energies = []
+    for start in range(0, bitstrings.shape[0], chunk_size):
+        x = bitstrings[start:start + chunk_size]
+        if isinstance(Q, tuple):
+            row, col, weight, diag = Q
+            energies.append((diag * x * x).sum(-1) + (weight * x[:, row] * x[:, col]).sum(-1))
+        else:
+            energies.append(((x @ Q) * x).sum(-1))
+    return torch.cat(energies)
+
+def best_rounding(probs, Q, n_samples=64, thresholds=None, generator=None, chunk_size=None):
+    # 一次采样、一次批量打分，返回能量最低的比特串及其能量（最大割中割值 = -能量）
+    with torch.no_grad():
+        candidates = sample_bitstrings(probs, n_samples, thresholds, generator)
+        energies = qubo_energies(candidates, Q, chunk_size)
+        best = torch.argmin(energies)
+    return candidates[best], energies[best]
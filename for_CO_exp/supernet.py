@@ -0,0 +1,173 @@
+#权重共享的 one-shot supernet：每个 DAG 位置上都持有全部候选操作，每张图只训练一次（均匀采样 link 和操作路径）
+#之后任意 (link, ops) 从 supernet 继承权重和节点嵌入，只需短暂微调即可打分；checkpoint 按图内容哈希和训练设置保存在磁盘上
+import hashlib
+import os
+import random
+import threading
+from functools import partial
+from time import time
+import torch
+import torch.nn as nn
+import create_gnn
+from co_corefunc import loss_func, qubo_edge_list
+from graph_cache import load_graph, file_hash
+from results_store import graph_name
+from train_gnn import make_op, op_name, dag_forward, topological_order, output_nodes, get_MyGNN, device1, dtype, \
+    graph_path, evaluate_candidates
+from torch_geometric.data import Data
+
+cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".supernet_cache")
+cache_version = 2   #SuperNet 结构、训练方式或 checkpoint 内容变化时加一，旧 checkpoint 自动失效
+supernet_ops = ['gat', 'gcn', 'gin', 'cheb', 'sage', 'arma', 'graph', 'fc', 'skip']
+
+_checkpoints = {}
+_lock = threading.Lock()    #并发搜索的 link 线程共用同一个 supernet，只训练一次
+
+class SuperNet(nn.Module):
+    """
+    每种操作各有一份读输入特征的 op 和一份读隐藏层的 op + '1'，命名与 MyGraphNetwork 一致；
+    fc_out1 ... fc_out{n_slots} 对应 1 ... n_slots 个输出节点的拼接，forward 时按给定的 (link, option_list) 走一条路径
+    """
+    def __init__(self, in_features, out_features, ops=supernet_ops, n_slots=4, hidden_dim=5, cheb_order=2, dropout=0.1):
+        super(SuperNet, self).__init__()
+        self.ops = list(ops)
+        for op in self.ops:
+            self.add_module(op, make_op(op, in_features, hidden_dim, cheb_order).to(device1))
+            self.add_module(op + '1', make_op(op, hidden_dim, hidden_dim, cheb_order).to(device1))
+        for k in range(1, n_slots + 1):
+            self.add_module('fc_out{}'.format(k), nn.Linear(hidden_dim * k, out_features).to(device1))
+        self.dropout_frac = dropout
+
+    def forward(self, data, link, option_list):
+        outputs = output_nodes(link)
+        op_names = [op_name(op, src) for op, src in zip(option_list, link)]
+        return dag_forward(self, data, link, option_list, topological_order(link), op_names, outputs,
+                           getattr(self, 'fc_out{}'.format(len(outputs))), self.dropout_frac)
+
+def child_state_dict(super_state, link, option_list):
+    # 从 supernet 的 state_dict 中取出 (link, option_list) 用到的参数，键名换成 MyGraphNetwork 的键名
+    names = {op_name(op, src) for op, src in zip(option_list, link)}
+    fc_out = 'fc_out{}'.format(len(output_nodes(link)))
+    child = {}
+    for key, value in super_state.items():
+        module, rest = key.split('.', 1)
+        if module in names:
+            child[key] = value.clone()
+        elif module == fc_out:
+            child['fc_out.' + rest] = value.clone()
+    return child
+
+def checkpoint_path(graph_file, in_features, n_epochs=5000, ops=supernet_ops, links=(), cache_dir=cache_dir):
+    # 文件名带有训练 supernet 的全部设置：图内容哈希、in_features、n_epochs，以及操作集合和 link 集合的哈希
+    settings = hashlib.sha1(repr((sorted(ops), sorted(tuple(link) for link in links))).encode('utf-8')).hexdigest()[:12]
+    return os.path.join(cache_dir, "v{}_{}_{}_{}_{}.pt".format(cache_version, file_hash(graph_file), in_features,
+                                                               n_epochs, settings))
+
+def train_supernet(links, graph_file=graph_path, n_epochs=5000, in_features=369, ops=supernet_ops, cache_dir=cache_dir):
+    """
+    在 graph_file 上训练 supernet 并返回 checkpoint {'net', 'embed', 'in_features', 'ops', 'links', 'n_epochs', 'path'}；
+    已有相同设置的 checkpoint 时直接读取
+    每个 epoch 从 links 中均匀采样一个 link、每个位置从 ops 中均匀采样一个操作，只更新这条路径上的参数
+    """
+    path = checkpoint_path(graph_file, in_features, n_epochs, ops, links, cache_dir)
+    with _lock:
+        if path in _checkpoints:
+            return _checkpoints[path]
+        if os.path.exists(path):
+            checkpoint = torch.load(path, map_location=device1)
+            _checkpoints[path] = checkpoint
+            return checkpoint
+
+        edge_index, n_nodes, n_edges, Q = load_graph(graph_file)
+        edge_index = torch.tensor(edge_index, dtype=torch.long, device=device1)
+        Q = qubo_edge_list(Q, device=device1)
+        model = partial(SuperNet, ops=ops, n_slots=len(links[0]))
+        net, embed, optimizer = create_gnn.get_gnn_params(in_features, 1, n_nodes, model)
+        data = Data(x=embed.weight, edge_index=edge_index)
+
+        print(f'Training supernet on {graph_file} for {n_epochs} epochs...')
+        for epoch in range(n_epochs):
+            link = random.choice(links)
+            option_list = [random.choice(ops) for _ in link]
+            probs = net(data, link, option_list)[:, 0]
+            loss = loss_func(probs, Q)
+            if epoch % create_gnn.out == 0:
+                print(f'Epoch: {epoch}, Loss:{loss.item()}')
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+
+        checkpoint = {'net': net.state_dict(), 'embed': embed.state_dict(), 'in_features': in_features,
+                      'ops': sorted(ops), 'links': sorted(list(link) for link in links), 'n_epochs': n_epochs,
+                      'path': os.path.basename(path)}
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = path + ".{}.tmp".format(os.getpid())
+        torch.save(checkpoint, tmp)
+        os.replace(tmp, path)
+        _checkpoints[path] = checkpoint
+        return checkpoint
+
+def inherit_params(link, option_list, checkpoint, n_nodes):
+    # 与 create_gnn.get_gnn_params 相同的 (net, embed, optimizer)，但参数和节点嵌入取自 supernet
+    net, embed, optimizer = create_gnn.get_gnn_params(checkpoint['in_features'], 1, n_nodes,
+                                                      get_MyGNN(link, option_list))
+    net.load_state_dict(child_state_dict(checkpoint['net'], link, option_list))
+    embed.load_state_dict(checkpoint['embed'])
+    return net, embed, optimizer
+
+def score_one_shot(link, option_list, checkpoint, edge_index, n_nodes, Q, finetune_epochs=200, n_samples=0):
+    # 继承 supernet 权重后微调 finetune_epochs 个 epoch，返回 (最优割值, 对应的比特串)
+    net, embed, optimizer = inherit_params(link, option_list, checkpoint, n_nodes)
+    net, epoch, final_bitstring, best_bitstring, losses, epochs = create_gnn.run_gnn_training_GPT4GNAS(
+        embed, None, Q, net, optimizer, edge_index, n_samples, 1, finetune_epochs)
+    return float(-loss_func(best_bitstring.type(dtype).to(device1), Q)), best_bitstring
+
+def _score_candidates(checkpoint, edge_index, n_nodes, Q, link, gnn_list, seeds, finetune_epochs=200):
+    # evaluate_candidates 的 train_fn：逐个 one-shot 打分，返回 [(cut, best_bitstring, raw_cut, wall_time), ...]
+    results = []
+    for sublist, seed in zip(gnn_list, seeds):
+        if seed is not None:
+            torch.manual_seed(seed)
+        start = time()
+        result, best_bitstring = score_one_shot(link, sublist, checkpoint, edge_index, n_nodes, Q, finetune_epochs)
+        results.append((result, best_bitstring, result, time() - start))
+    return results
+
+def get_acc_list_one_shot(link, all_egdes, option_list, links, output_file="experiment.txt", finetune_epochs=200,
+                          store=None, iteration=0, cache=None, **supernet_kwargs):
+    """
+    one-shot 版本的 get_acc_list：第一次调用时训练（或读取）当前图的 supernet，之后每个候选只微调 finetune_epochs 个 epoch
+    supernet_kwargs 原样传给 train_supernet（n_epochs、in_features 等）；store / iteration / output_file 的含义与 get_acc_list 相同
+    候选经 train_gnn.evaluate_candidates 打分：同构或重复的架构只打分一次；cache 为 result_cache.ResultCache 时，
+    缓存键中带有 one-shot 标记、finetune_epochs 和 supernet checkpoint，不会与完整训练的结果混用
+    """
+    graph_file = supernet_kwargs.get('graph_file', graph_path)
+    checkpoint = train_supernet(links, **supernet_kwargs)
+    edge_index, n_nodes, n_edges, Q = load_graph(graph_file)
+    edge_index = torch.tensor(edge_index, dtype=torch.long, device=device1)
+    Q = qubo_edge_list(Q, device=device1)
+    # 缓存键中的 supernet 设置取自 checkpoint 中实际使用的值，而不是调用时的参数（未给出时为函数默认值）
+    config = {'one_shot': checkpoint['path'], 'supernet_ops': checkpoint['ops'], 'supernet_links': checkpoint['links'],
+              'supernet_epochs': checkpoint['n_epochs']}
+
+    results = evaluate_candidates(link, option_list, cache=cache,
+                                  train_fn=partial(_score_candidates, checkpoint, edge_index, n_nodes, Q),
+                                  graph_file=graph_file, config=config, finetune_epochs=finetune_epochs)
+    all_best_result = []
+    acc_list = []
+    for sublist, (result, best_bitstring, raw_result) in zip(option_list, results):
+        print(f"the one-shot result of:{sublist} ", result)
+        all_best_result.append(result)
+        acc_list.append(result / all_egdes)
+        if output_file is None:
+            continue
+        with open(output_file, "a") as file:
+            file.write(str(sublist) + "     " + str(result) + "     one-shot\n")
+
+    if store is not None:
+        store.add_batch(graph_name(graph_file), link, iteration, option_list,
+                        acc_list, all_best_result, method='one-shot')
+    print(all_best_result)
+    print(acc_list)
+
+    return acc_list
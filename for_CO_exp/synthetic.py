@@ -0,0 +1,38 @@
+#合成图生成器：向量化的随机 d-正则图 / Erdős–Rényi 图，可写成 Gset 格式供 load_data.read_gset 和 graph_cache 读取
+import numpy as np
+
+def random_regular_edges(n_nodes, degree=3, seed=None):
+    """
+    配置模型生成近似 d-正则的随机图：每个节点 degree 个桩随机配对，去掉自环和重边（只有极少数节点的度数会少 1）
+    返回 (E, 2) 的 int32 边数组，每条边 u < v；n_nodes * degree 需为偶数
+    """
+    if n_nodes * degree % 2:
+        raise ValueError(f"n_nodes * degree must be even, got {n_nodes} * {degree}")
+    rng = np.random.default_rng(seed)
+    stubs = rng.permutation(np.repeat(np.arange(n_nodes, dtype=np.int32), degree)).reshape(-1, 2)
+    stubs = np.sort(stubs[stubs[:, 0] != stubs[:, 1]], axis=1)
+    return np.unique(stubs, axis=0)
+
+def erdos_renyi_edges(n_nodes, avg_degree=3., seed=None):
+    """
+    G(n, m) 形式的 Erdős–Rényi 图，m = n * avg_degree / 2：一次采样略多于 m 个节点对，去掉自环和重边后截取 m 条
+    返回 (E, 2) 的 int32 边数组，每条边 u < v
+    """
+    rng = np.random.default_rng(seed)
+    n_edges = int(round(n_nodes * avg_degree / 2))
+    edges = np.empty((0, 2), dtype=np.int32)
+    while len(edges) < n_edges:
+        pairs = rng.integers(0, n_nodes, size=(int(n_edges * 1.1) + 16, 2), dtype=np.int32)
+        pairs = np.sort(pairs[pairs[:, 0] != pairs[:, 1]], axis=1)
+        edges = np.unique(np.concatenate((edges, pairs)), axis=0)
+    return edges[rng.permutation(len(edges))[:n_edges]]
+
+def write_gset(path, edges, n_nodes, weights=None):
+    # Gset 格式：首行 "N E"，其后每行 "u v w"，节点编号从 1 开始
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    if weights is None:
+        weights = np.ones(len(edges), dtype=np.int64)
+    rows = np.column_stack((edges + 1, weights))
+    with open(path, 'w') as f:
+        f.write("{} {}\n".format(n_nodes, len(edges)))
+        np.savetxt(f, rows, fmt='%d')
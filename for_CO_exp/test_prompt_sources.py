@@ -0,0 +1,45 @@
+#prompt 历史结果的三种来源（见 main.py 的 prompt_source）：history / store / list，各自都能走到
+#python -m pytest test_prompt_sources.py
+import pytest
+from untils import experiments_prompt
+from results_store import ResultsStore
+from prompt_history import PromptHistory
+
+link = [0, 0, 1, 1]
+header = 'Here are some experimental results'
+
+def _archs(ops_list):
+    return [{'arch_Operations': ', '.join(ops), 'fidelity': 1.0} for ops in ops_list]
+
+def test_store_path(tmp_path):
+    store = ResultsStore(str(tmp_path / "experiment.db"), run="test")
+    store.add_batch("G14", link, 0, [['gcn', 'gat', 'sage', 'gin']], [0.5])
+    store.add_batch("G14", link, 1, [['fc', 'fc', 'fc', 'fc']], [0.7])
+    # arch_list / acc_list 为空，prompt 中的结果只可能来自结果库
+    prompt = experiments_prompt([], [], 'G14', store=store, graph="G14", link=link)
+    assert 'Model [fc, fc, fc, fc] achieves accuracy 0.7000' in prompt
+    assert 'Model [gcn, gat, sage, gin] achieves accuracy 0.5000' in prompt
+    store.close()
+
+def test_history_first_round_has_no_top_section():
+    history = PromptHistory(link, top_k=20)
+    history.add_round(_archs([['gcn', 'gat', 'sage', 'gin']]), [0.5])
+    prompt = experiments_prompt([], [], 'G14', history=history)
+    assert 'Model [gcn, gat, sage, gin] achieves accuracy 0.5000' in prompt
+    assert header not in prompt
+
+    history.add_round(_archs([['fc', 'fc', 'fc', 'fc']]), [0.7])
+    prompt = experiments_prompt([], [], 'G14', history=history)
+    assert header in prompt
+    assert prompt.index('Model [fc, fc, fc, fc]') < prompt.index(header) < prompt.index('Model [gcn, gat, sage, gin]')
+
+def test_list_path():
+    arch_list = _archs([['gcn', 'gat', 'sage', 'gin'], ['fc', 'fc', 'fc', 'fc']])
+    prompt = experiments_prompt(arch_list, [0.5, 0.7], 'G14')
+    assert 'Model [fc, fc, fc, fc] achieves accuracy 0.7000' in prompt
+
+def test_only_one_source(tmp_path):
+    store = ResultsStore(str(tmp_path / "experiment.db"), run="test")
+    with pytest.raises(ValueError):
+        experiments_prompt([], [], 'G14', store=store, graph="G14", link=link, history=PromptHistory(link))
+    store.close()
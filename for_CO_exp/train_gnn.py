@@ -1,820 +1,703 @@
+import os
 from time import time
-import csv
-from load_data import get_edge_index
-import jax.numpy as jnp
-import networkx as nx
-from co_corefunc import create_Q_matrix
+from functools import partial
+import numpy as np
+from graph_cache import load_graph
+from co_corefunc import qubo_edge_list, loss_func
+from local_search import symmetric_qubo, polish_bitstring
+from proxy import proxy_scores, combine_scores, split_by_percentile
+from result_cache import result_key
+from results_store import graph_name
+from canonical import canonical_ops
+from warm_start import load_parent_state, export_state, warm_budget
+from mis import mis_qubo_batch, qubo_slice, adjacency, repair_independent_set
 import create_gnn
 import torch
 import torch.nn as nn
-from torch_geometric.nn import GCNConv, GATConv, GINConv, SAGEConv, ChebConv, ARMAConv, GraphConv
+from torch_geometric.nn import GATConv, GINConv, SAGEConv
+from propagation import CachedGCNConv, CachedChebConv, CachedARMAConv, CachedGraphConv
 import torch.nn.functional as F
 device1 = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 dtype = torch.float32
+graph_path = "../G14.txt"
+# README 中基准表对应的图，多图模式（evaluate_on_graphs）一次训练全部
+benchmark_graphs = ["G14", "G15", "G22", "G49", "G50", "G55", "G70"]
+benchmark_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 
-class MyGraphNetwork0000(nn.Module):
-    option_list = None
-    def __init__(self, in_features, out_features,hidden_dim=5, cheb_order=2, dropout=0.1):
-        super(MyGraphNetwork0000, self).__init__()
-        self.gcn = GCNConv(in_features, hidden_dim).to(device1)
-        self.gat = GATConv(in_features, hidden_dim).to(device1)
-        self.sage = SAGEConv(in_features, hidden_dim).to(device1)
-        self.gin = GINConv(nn.Sequential(nn.Linear(in_features, hidden_dim), nn.ReLU())).to(device1)
-        self.cheb = ChebConv(in_features, hidden_dim, cheb_order).to(device1)
-        self.arma = ARMAConv(in_features, hidden_dim).to(device1)
-        self.graph = GraphConv(in_features, hidden_dim).to(device1)
-        self.skip = nn.Linear(in_features, hidden_dim).to(device1)
-        self.fc = nn.Linear(in_features, hidden_dim).to(device1)
-        self.fc_out = nn.Linear(hidden_dim * 4, out_features).to(device1)
-        self.dropout_frac = dropout
-
-    def forward(self, data):
-        x, edge_index = data.x, data.edge_index
-        case = {
-            'gcn': self.gcn(x, edge_index),
-            'gat': self.gat(x, edge_index),
-            'sage': self.sage(x, edge_index),
-            'gin': self.gin(x, edge_index),
-            'cheb': self.cheb(x, edge_index),
-            'arma': self.arma(x, edge_index),
-            'graph': self.graph(x, edge_index),
-            'skip': self.skip(x),
-            'fc': self.fc(x),
-        }
-
-        x_1 = case.get(self.option_list[0])
-        x_1 = torch.relu(x_1)
-        x_1 = F.dropout(x_1, p=self.dropout_frac)
-
-        x_2 = case.get(self.option_list[1])
-        x_2 = torch.relu(x_2)
-        x_2 = F.dropout(x_2, p=self.dropout_frac)
-
-        x_3 = case.get(self.option_list[2])
-        x_3 = torch.relu(x_3)
-        x_3 = F.dropout(x_3, p=self.dropout_frac)
-
-        x_4 = case.get(self.option_list[3])
-        x_4 = torch.relu(x_4)
-        x_4 = F.dropout(x_4, p=self.dropout_frac)
-
-        output = torch.cat((x_1, x_2, x_3, x_4), dim=1)
-        output = self.fc_out(output)
-        output = torch.sigmoid(output)
-
-        return output
-
-class MyGraphNetwork0001(nn.Module):
-    option_list = None
-    def __init__(self, in_features, out_features,hidden_dim=5, cheb_order=2, dropout=0.1):
-        super(MyGraphNetwork0001, self).__init__()
-        self.gcn = GCNConv(in_features, hidden_dim).to(device1)
-        self.gat = GATConv(in_features, hidden_dim).to(device1)
-        self.sage = SAGEConv(in_features, hidden_dim).to(device1)
-        self.gin = GINConv(nn.Sequential(nn.Linear(in_features, hidden_dim), nn.ReLU())).to(device1)
-        self.cheb = ChebConv(in_features, hidden_dim, cheb_order).to(device1)
-        self.arma = ARMAConv(in_features, hidden_dim).to(device1)
-        self.graph = GraphConv(in_features, hidden_dim).to(device1)
-        self.skip = nn.Linear(in_features, hidden_dim).to(device1)
-        self.fc = nn.Linear(in_features, hidden_dim).to(device1)
-
-        self.gcn1 = GCNConv(hidden_dim, hidden_dim).to(device1)
-        self.gat1 = GATConv(hidden_dim, hidden_dim).to(device1)
-        self.sage1 = SAGEConv(hidden_dim, hidden_dim).to(device1)
-        self.gin1 = GINConv(nn.Sequential(nn.Linear(hidden_dim, hidden_dim), nn.ReLU())).to(device1)
-        self.cheb1 = ChebConv(hidden_dim, hidden_dim, cheb_order).to(device1)
-        self.arma1 = ARMAConv(hidden_dim, hidden_dim).to(device1)
-        self.graph1 = GraphConv(hidden_dim, hidden_dim).to(device1)
-        self.skip1 = nn.Linear(hidden_dim, hidden_dim).to(device1)
-        self.fc1 = nn.Linear(hidden_dim, hidden_dim).to(device1)
-        self.fc_out = nn.Linear(hidden_dim * 3, out_features).to(device1)
-        self.dropout_frac = dropout
-
-    def forward(self, data):
-        x, edge_index = data.x, data.edge_index
-        case = {
-            'gcn': self.gcn(x, edge_index),
-            'gat': self.gat(x, edge_index),
-            'sage': self.sage(x, edge_index),
-            'gin': self.gin(x, edge_index),
-            'cheb': self.cheb(x, edge_index),
-            'arma': self.arma(x, edge_index),
-            'graph': self.graph(x, edge_index),
-            'skip': self.skip(x),
-            'fc': self.fc(x),
-        }
-
-        x_1 = case.get(self.option_list[0])
-        x_1 = torch.relu(x_1)
-        x_1 = F.dropout(x_1, p=self.dropout_frac)
-
-        x_2 = case.get(self.option_list[1])
-        x_2 = torch.relu(x_2)
-        x_2 = F.dropout(x_2, p=self.dropout_frac)
-
-        x_3 = case.get(self.option_list[2])
-        x_3 = torch.relu(x_3)
-        x_3 = F.dropout(x_3, p=self.dropout_frac)
-
-        case2 = {
-            'gcn': self.gcn1(x_1, edge_index),
-            'gat': self.gat1(x_1, edge_index),
-            'sage': self.sage1(x_1, edge_index),
-            'gin': self.gin1(x_1, edge_index),
-            'cheb': self.cheb1(x_1, edge_index),
-            'arma': self.arma1(x_1, edge_index),
-            'graph': self.graph1(x_1, edge_index),
-            'skip': self.skip1(x_1),
-            'fc': self.fc1(x_1),
-        }
-
-        x_4 = case2.get(self.option_list[3])
-        x_4 = torch.relu(x_4)
-        x_4 = F.dropout(x_4, p=self.dropout_frac)
-
-        output = torch.cat((x_2, x_3, x_4), dim=1)
-        output = self.fc_out(output)
-        output = torch.sigmoid(output)
-
-        return output
-
-class MyGraphNetwork0011(nn.Module):
-    option_list = None
-    def __init__(self, in_features, out_features,hidden_dim=5, cheb_order=2, dropout=0.1):
-        super(MyGraphNetwork0011, self).__init__()
-        self.gcn = GCNConv(in_features, hidden_dim).to(device1)
-        self.gat = GATConv(in_features, hidden_dim).to(device1)
-        self.sage = SAGEConv(in_features, hidden_dim).to(device1)
-        self.gin = GINConv(nn.Sequential(nn.Linear(in_features, hidden_dim), nn.ReLU())).to(device1)
-        self.cheb = ChebConv(in_features, hidden_dim, cheb_order).to(device1)
-        self.arma = ARMAConv(in_features, hidden_dim).to(device1)
-        self.graph = GraphConv(in_features, hidden_dim).to(device1)
-        self.skip = nn.Linear(in_features, hidden_dim).to(device1)
-        self.fc = nn.Linear(in_features, hidden_dim).to(device1)
-
-        self.gcn1 = GCNConv(hidden_dim, hidden_dim).to(device1)
-        self.gat1 = GATConv(hidden_dim, hidden_dim).to(device1)
-        self.sage1 = SAGEConv(hidden_dim, hidden_dim).to(device1)
-        self.gin1 = GINConv(nn.Sequential(nn.Linear(hidden_dim, hidden_dim), nn.ReLU())).to(device1)
-        self.cheb1 = ChebConv(hidden_dim, hidden_dim, cheb_order).to(device1)
-        self.arma1 = ARMAConv(hidden_dim, hidden_dim).to(device1)
-        self.graph1 = GraphConv(hidden_dim, hidden_dim).to(device1)
-        self.skip1 = nn.Linear(hidden_dim, hidden_dim).to(device1)
-        self.fc1 = nn.Linear(hidden_dim, hidden_dim).to(device1)
-        self.dropout_frac = dropout
-
-        self.fc_out = nn.Linear(hidden_dim * 3, out_features).to(device1)
-
-    def forward(self, data):
-        x, edge_index = data.x, data.edge_index
-        case = {
-            'gcn': self.gcn(x, edge_index),
-            'gat': self.gat(x, edge_index),
-            'sage': self.sage(x, edge_index),
-            'gin': self.gin(x, edge_index),
-            'cheb': self.cheb(x, edge_index),
-            'arma': self.arma(x, edge_index),
-            'graph': self.graph(x, edge_index),
-            'skip': self.skip(x),
-            'fc': self.fc(x),
-        }
-
-        x_1 = case.get(self.option_list[0])
-        x_1 = torch.relu(x_1)
-        x_1 = F.dropout(x_1, p=self.dropout_frac)
-
-        case2 = {
-            'gcn': self.gcn1(x_1, edge_index),
-            'gat': self.gat1(x_1, edge_index),
-            'sage': self.sage1(x_1, edge_index),
-            'gin': self.gin1(x_1, edge_index),
-            'cheb': self.cheb1(x_1, edge_index),
-            'arma': self.arma1(x_1, edge_index),
-            'graph': self.graph1(x_1, edge_index),
-            'skip': self.skip1(x_1),
-            'fc': self.fc1(x_1),
-        }
-        x_2 = case.get(self.option_list[1])
-        x_2 = torch.relu(x_2)
-        x_2 = F.dropout(x_2, p=self.dropout_frac)
-
-        x_3 = case2.get(self.option_list[2])
-        x_3 = torch.relu(x_3)
-        x_3 = F.dropout(x_3, p=self.dropout_frac)
-
-        x_4 = case2.get(self.option_list[3])
-        x_4 = torch.relu(x_4)
-        x_4 = F.dropout(x_4, p=self.dropout_frac)
-
-        output = torch.cat((x_2, x_3, x_4), dim=1)
-        output = self.fc_out(output)
-        output = torch.sigmoid(output)
-
-        return output
-
-class MyGraphNetwork0012(nn.Module):
-    option_list = None
-    def __init__(self, in_features, out_features, hidden_dim=5, cheb_order=2, dropout=0.1):
-        super(MyGraphNetwork0012, self).__init__()
-        self.gcn = GCNConv(in_features, hidden_dim).to(device1)
-        self.gat = GATConv(in_features, hidden_dim).to(device1)
-        self.sage = SAGEConv(in_features, hidden_dim).to(device1)
-        self.gin = GINConv(nn.Sequential(nn.Linear(in_features, hidden_dim), nn.ReLU())).to(device1)
-        self.cheb = ChebConv(in_features, hidden_dim, cheb_order).to(device1)
-        self.arma = ARMAConv(in_features, hidden_dim).to(device1)
-        self.graph = GraphConv(in_features, hidden_dim).to(device1)
-        self.skip = nn.Linear(in_features, hidden_dim).to(device1)
-        self.fc = nn.Linear(in_features, hidden_dim).to(device1)
-
-        self.gcn1 = GCNConv(hidden_dim, hidden_dim).to(device1)
-        self.gat1 = GATConv(hidden_dim, hidden_dim).to(device1)
-        self.sage1 = SAGEConv(hidden_dim, hidden_dim).to(device1)
-        self.gin1 = GINConv(nn.Sequential(nn.Linear(hidden_dim, hidden_dim), nn.ReLU())).to(device1)
-        self.cheb1 = ChebConv(hidden_dim, hidden_dim, cheb_order).to(device1)
-        self.arma1 = ARMAConv(hidden_dim, hidden_dim).to(device1)
-        self.graph1 = GraphConv(hidden_dim, hidden_dim).to(device1)
-        self.skip1 = nn.Linear(hidden_dim, hidden_dim).to(device1)
-        self.fc1 = nn.Linear(hidden_dim, hidden_dim).to(device1)
-        self.dropout_frac = dropout
-
-        self.fc_out = nn.Linear(hidden_dim * 2, out_features).to(device1)
-
-    def forward(self, data):
-        x, edge_index = data.x, data.edge_index
-        case = {
-            'gcn': self.gcn(x, edge_index),
-            'gat': self.gat(x, edge_index),
-            'sage': self.sage(x, edge_index),
-            'gin': self.gin(x, edge_index),
-            'cheb': self.cheb(x, edge_index),
-            'arma': self.arma(x, edge_index),
-            'graph': self.graph(x, edge_index),
-            'skip': self.skip(x),
-            'fc': self.fc(x),
-        }
-
-        x_1 = case.get(self.option_list[0])
-        x_1 = torch.relu(x_1)
-        x_1 = F.dropout(x_1, p=self.dropout_frac)
-
-        case2 = {
-            'gcn': self.gcn1(x_1, edge_index),
-            'gat': self.gat1(x_1, edge_index),
-            'sage': self.sage1(x_1, edge_index),
-            'gin': self.gin1(x_1, edge_index),
-            'cheb': self.cheb1(x_1, edge_index),
-            'arma': self.arma1(x_1, edge_index),
-            'graph': self.graph1(x_1, edge_index),
-            'skip': self.skip1(x_1),
-            'fc': self.fc1(x_1),
-        }
-        x_2 = case.get(self.option_list[1])
-        x_2 = torch.relu(x_2)
-        x_2 = F.dropout(x_2, p=self.dropout_frac)
-
-        case3 = {
-            'gcn': self.gcn1(x_2, edge_index),
-            'gat': self.gat1(x_2, edge_index),
-            'sage': self.sage1(x_2, edge_index),
-            'gin': self.gin1(x_2, edge_index),
-            'cheb': self.cheb1(x_2, edge_index),
-            'arma': self.arma1(x_2, edge_index),
-            'graph': self.graph1(x_2, edge_index),
-            'skip': self.skip1(x_2),
-            'fc': self.fc1(x_2),
-        }
-
-        x_3 = case2.get(self.option_list[2])
-        x_3 = torch.relu(x_3)
-        x_3 = F.dropout(x_3, p=self.dropout_frac)
-
-        x_4 = case3.get(self.option_list[3])
-        x_4 = torch.relu(x_4)
-        x_4 = F.dropout(x_4, p=self.dropout_frac)
-
-        output = torch.cat((x_3, x_4), dim=1)
-        output = self.fc_out(output)
-        output = torch.sigmoid(output)
-
-        return output
-
-class MyGraphNetwork0013(nn.Module):
-    option_list = None
-    def __init__(self, in_features, out_features, hidden_dim=5, cheb_order=2, dropout=0.1):
-        super(MyGraphNetwork0013, self).__init__()
-        self.gcn = GCNConv(in_features, hidden_dim).to(device1)
-        self.gat = GATConv(in_features, hidden_dim).to(device1)
-        self.sage = SAGEConv(in_features, hidden_dim).to(device1)
-        self.gin = GINConv(nn.Sequential(nn.Linear(in_features, hidden_dim), nn.ReLU())).to(device1)
-        self.cheb = ChebConv(in_features, hidden_dim, cheb_order).to(device1)
-        self.arma = ARMAConv(in_features, hidden_dim).to(device1)
-        self.graph = GraphConv(in_features, hidden_dim).to(device1)
-        self.skip = nn.Linear(in_features, hidden_dim).to(device1)
-        self.fc = nn.Linear(in_features, hidden_dim).to(device1)
-
-        self.gcn1 = GCNConv(hidden_dim, hidden_dim).to(device1)
-        self.gat1 = GATConv(hidden_dim, hidden_dim).to(device1)
-        self.sage1 = SAGEConv(hidden_dim, hidden_dim).to(device1)
-        self.gin1 = GINConv(nn.Sequential(nn.Linear(hidden_dim, hidden_dim), nn.ReLU())).to(device1)
-        self.cheb1 = ChebConv(hidden_dim, hidden_dim, cheb_order).to(device1)
-        self.arma1 = ARMAConv(hidden_dim, hidden_dim).to(device1)
-        self.graph1 = GraphConv(hidden_dim, hidden_dim).to(device1)
-        self.skip1 = nn.Linear(hidden_dim, hidden_dim).to(device1)
-        self.fc1 = nn.Linear(hidden_dim, hidden_dim).to(device1)
-        self.dropout_frac = dropout
-
-        self.fc_out = nn.Linear(hidden_dim * 2, out_features).to(device1)
-
-    def forward(self, data):
-        x, edge_index = data.x, data.edge_index
-        case = {
-            'gcn': self.gcn(x, edge_index),
-            'gat': self.gat(x, edge_index),
-            'sage': self.sage(x, edge_index),
-            'gin': self.gin(x, edge_index),
-            'cheb': self.cheb(x, edge_index),
-            'arma': self.arma(x, edge_index),
-            'graph': self.graph(x, edge_index),
-            'skip': self.skip(x),
-            'fc': self.fc(x),
-        }
-
-        x_1 = case.get(self.option_list[0])
-        x_1 = torch.relu(x_1)
-        x_1 = F.dropout(x_1, p=self.dropout_frac)
-
-        case2 = {
-            'gcn': self.gcn1(x_1, edge_index),
-            'gat': self.gat1(x_1, edge_index),
-            'sage': self.sage1(x_1, edge_index),
-            'gin': self.gin1(x_1, edge_index),
-            'cheb': self.cheb1(x_1, edge_index),
-            'arma': self.arma1(x_1, edge_index),
-            'graph': self.graph1(x_1, edge_index),
-            'skip': self.skip1(x_1),
-            'fc': self.fc1(x_1),
-        }
-        x_2 = case.get(self.option_list[1])
-        x_2 = torch.relu(x_2)
-        x_2 = F.dropout(x_2, p=self.dropout_frac)
-
-        x_3 = case2.get(self.option_list[2])
-        x_3 = torch.relu(x_3)
-        x_3 = F.dropout(x_3, p=self.dropout_frac)
-
-        case3 = {
-            'gcn': self.gcn1(x_3, edge_index),
-            'gat': self.gat1(x_3, edge_index),
-            'sage': self.sage1(x_3, edge_index),
-            'gin': self.gin1(x_3, edge_index),
-            'cheb': self.cheb1(x_3, edge_index),
-            'arma': self.arma1(x_3, edge_index),
-            'graph': self.graph1(x_3, edge_index),
-            'skip': self.skip1(x_3),
-            'fc': self.fc1(x_3),
-        }
-
-        x_4 = case3.get(self.option_list[3])
-        x_4 = torch.relu(x_4)
-        x_4 = F.dropout(x_4, p=self.dropout_frac)
-
-        output = torch.cat((x_2, x_4), dim=1)
-        output = self.fc_out(output)
-        output = torch.sigmoid(output)
-
-        return output
-
-class MyGraphNetwork0111(nn.Module):
-    option_list = None
-    def __init__(self, in_features, out_features, hidden_dim=5, cheb_order=2, dropout=0.1):
-        super(MyGraphNetwork0111, self).__init__()
-        self.gcn = GCNConv(in_features, hidden_dim).to(device1)
-        self.gat = GATConv(in_features, hidden_dim).to(device1)
-        self.sage = SAGEConv(in_features, hidden_dim).to(device1)
-        self.gin = GINConv(nn.Sequential(nn.Linear(in_features, hidden_dim), nn.ReLU())).to(device1)
-        self.cheb = ChebConv(in_features, hidden_dim, cheb_order).to(device1)
-        self.arma = ARMAConv(in_features, hidden_dim).to(device1)
-        self.graph = GraphConv(in_features, hidden_dim).to(device1)
-        self.skip = nn.Linear(in_features, hidden_dim).to(device1)
-        self.fc = nn.Linear(in_features, hidden_dim).to(device1)
-
-        self.gcn1 = GCNConv(hidden_dim, hidden_dim).to(device1)
-        self.gat1 = GATConv(hidden_dim, hidden_dim).to(device1)
-        self.sage1 = SAGEConv(hidden_dim, hidden_dim).to(device1)
-        self.gin1 = GINConv(nn.Sequential(nn.Linear(hidden_dim, hidden_dim), nn.ReLU())).to(device1)
-        self.cheb1 = ChebConv(hidden_dim, hidden_dim, cheb_order).to(device1)
-        self.arma1 = ARMAConv(hidden_dim, hidden_dim).to(device1)
-        self.graph1 = GraphConv(hidden_dim, hidden_dim).to(device1)
-        self.skip1 = nn.Linear(hidden_dim, hidden_dim).to(device1)
-        self.fc1 = nn.Linear(hidden_dim, hidden_dim).to(device1)
-        self.dropout_frac = dropout
-
-        self.fc_out = nn.Linear(hidden_dim * 3, out_features).to(device1)
-
-    def forward(self, data):
-        x, edge_index = data.x, data.edge_index
-        case = {
-            'gcn': self.gcn(x, edge_index),
-            'gat': self.gat(x, edge_index),
-            'sage': self.sage(x, edge_index),
-            'gin': self.gin(x, edge_index),
-            'cheb': self.cheb(x, edge_index),
-            'arma': self.arma(x, edge_index),
-            'graph': self.graph(x, edge_index),
-            'skip': self.skip(x),
-            'fc': self.fc(x),
-        }
-
-        x_1 = case.get(self.option_list[0])
-        x_1 = torch.relu(x_1)
-        x_1 = F.dropout(x_1, p=self.dropout_frac)
-
-        case2 = {
-            'gcn': self.gcn1(x_1, edge_index),
-            'gat': self.gat1(x_1, edge_index),
-            'sage': self.sage1(x_1, edge_index),
-            'gin': self.gin1(x_1, edge_index),
-            'cheb': self.cheb1(x_1, edge_index),
-            'arma': self.arma1(x_1, edge_index),
-            'graph': self.graph1(x_1, edge_index),
-            'skip': self.skip1(x_1),
-            'fc': self.fc1(x_1),
-        }
-        x_2 = case2.get(self.option_list[1])
-        x_2 = torch.relu(x_2)
-        x_2 = F.dropout(x_2, p=self.dropout_frac)
-
-        x_3 = case2.get(self.option_list[2])
-        x_3 = torch.relu(x_3)
-        x_3 = F.dropout(x_3, p=self.dropout_frac)
-
-        x_4 = case2.get(self.option_list[3])
-        x_4 = torch.relu(x_4)
-        x_4 = F.dropout(x_4, p=self.dropout_frac)
-
-        output = torch.cat((x_2, x_3, x_4), dim=1)
-        output = self.fc_out(output)
-        output = torch.sigmoid(output)
-
-        return output
-
-class MyGraphNetwork0112(nn.Module):
-    option_list = None
-    def __init__(self, in_features, out_features, hidden_dim=5, cheb_order=2, dropout=0.1):
-        super(MyGraphNetwork0112, self).__init__()
-        self.gcn = GCNConv(in_features, hidden_dim).to(device1)
-        self.gat = GATConv(in_features, hidden_dim).to(device1)
-        self.sage = SAGEConv(in_features, hidden_dim).to(device1)
-        self.gin = GINConv(nn.Sequential(nn.Linear(in_features, hidden_dim), nn.ReLU())).to(device1)
-        self.cheb = ChebConv(in_features, hidden_dim, cheb_order).to(device1)
-        self.arma = ARMAConv(in_features, hidden_dim).to(device1)
-        self.graph = GraphConv(in_features, hidden_dim).to(device1)
-        self.skip = nn.Linear(in_features, hidden_dim).to(device1)
-        self.fc = nn.Linear(in_features, hidden_dim).to(device1)
-
-        self.gcn1 = GCNConv(hidden_dim, hidden_dim).to(device1)
-        self.gat1 = GATConv(hidden_dim, hidden_dim).to(device1)
-        self.sage1 = SAGEConv(hidden_dim, hidden_dim).to(device1)
-        self.gin1 = GINConv(nn.Sequential(nn.Linear(hidden_dim, hidden_dim), nn.ReLU())).to(device1)
-        self.cheb1 = ChebConv(hidden_dim, hidden_dim, cheb_order).to(device1)
-        self.arma1 = ARMAConv(hidden_dim, hidden_dim).to(device1)
-        self.graph1 = GraphConv(hidden_dim, hidden_dim).to(device1)
-        self.skip1 = nn.Linear(hidden_dim, hidden_dim).to(device1)
-        self.fc1 = nn.Linear(hidden_dim, hidden_dim).to(device1)
-        self.dropout_frac = dropout
-
-        self.fc_out = nn.Linear(hidden_dim * 2, out_features).to(device1)
-
-    def forward(self, data):
-        x, edge_index = data.x, data.edge_index
-        case = {
-            'gcn': self.gcn(x, edge_index),
-            'gat': self.gat(x, edge_index),
-            'sage': self.sage(x, edge_index),
-            'gin': self.gin(x, edge_index),
-            'cheb': self.cheb(x, edge_index),
-            'arma': self.arma(x, edge_index),
-            'graph': self.graph(x, edge_index),
-            'skip': self.skip(x),
-            'fc': self.fc(x),
-        }
-
-        x_1 = case.get(self.option_list[0])
-        x_1 = torch.relu(x_1)
-        x_1 = F.dropout(x_1, p=self.dropout_frac)
-
-        case2 = {
-            'gcn': self.gcn1(x_1, edge_index),
-            'gat': self.gat1(x_1, edge_index),
-            'sage': self.sage1(x_1, edge_index),
-            'gin': self.gin1(x_1, edge_index),
-            'cheb': self.cheb1(x_1, edge_index),
-            'arma': self.arma1(x_1, edge_index),
-            'graph': self.graph1(x_1, edge_index),
-            'skip': self.skip1(x_1),
-            'fc': self.fc1(x_1),
-        }
-        x_2 = case2.get(self.option_list[1])
-        x_2 = torch.relu(x_2)
-        x_2 = F.dropout(x_2, p=self.dropout_frac)
-
-        case3 = {
-            'gcn': self.gcn1(x_2, edge_index),
-            'gat': self.gat1(x_2, edge_index),
-            'sage': self.sage1(x_2, edge_index),
-            'gin': self.gin1(x_2, edge_index),
-            'cheb': self.cheb1(x_2, edge_index),
-            'arma': self.arma1(x_2, edge_index),
-            'graph': self.graph1(x_2, edge_index),
-            'skip': self.skip1(x_2),
-            'fc': self.fc1(x_2),
-        }
-        x_3 = case2.get(self.option_list[2])
-        x_3 = torch.relu(x_3)
-        x_3 = F.dropout(x_3, p=self.dropout_frac)
-
-        x_4 = case3.get(self.option_list[3])
-        x_4 = torch.relu(x_4)
-        x_4 = F.dropout(x_4, p=self.dropout_frac)
-
-        output = torch.cat((x_3, x_4), dim=1)
-        output = self.fc_out(output)
-        output = torch.sigmoid(output)
-
-        return output
-
-class MyGraphNetwork0122(nn.Module):
-    option_list = None
-    def __init__(self, in_features, out_features, hidden_dim=5, cheb_order=2, dropout=0.1):
-        super(MyGraphNetwork0122, self).__init__()
-        self.gcn = GCNConv(in_features, hidden_dim).to(device1)
-        self.gat = GATConv(in_features, hidden_dim).to(device1)
-        self.sage = SAGEConv(in_features, hidden_dim).to(device1)
-        self.gin = GINConv(nn.Sequential(nn.Linear(in_features, hidden_dim), nn.ReLU())).to(device1)
-        self.cheb = ChebConv(in_features, hidden_dim, cheb_order).to(device1)
-        self.arma = ARMAConv(in_features, hidden_dim).to(device1)
-        self.graph = GraphConv(in_features, hidden_dim).to(device1)
-        self.skip = nn.Linear(in_features, hidden_dim).to(device1)
-        self.fc = nn.Linear(in_features, hidden_dim).to(device1)
-
-        self.gcn1 = GCNConv(hidden_dim, hidden_dim).to(device1)
-        self.gat1 = GATConv(hidden_dim, hidden_dim).to(device1)
-        self.sage1 = SAGEConv(hidden_dim, hidden_dim).to(device1)
-        self.gin1 = GINConv(nn.Sequential(nn.Linear(hidden_dim, hidden_dim), nn.ReLU())).to(device1)
-        self.cheb1 = ChebConv(hidden_dim, hidden_dim, cheb_order).to(device1)
-        self.arma1 = ARMAConv(hidden_dim, hidden_dim).to(device1)
-        self.graph1 = GraphConv(hidden_dim, hidden_dim).to(device1)
-        self.skip1 = nn.Linear(hidden_dim, hidden_dim).to(device1)
-        self.fc1 = nn.Linear(hidden_dim, hidden_dim).to(device1)
-        self.dropout_frac = dropout
-
-        self.fc_out = nn.Linear(hidden_dim * 2, out_features).to(device1)
-
-    def forward(self, data):
-        x, edge_index = data.x, data.edge_index
-        case = {
-            'gcn': self.gcn(x, edge_index),
-            'gat': self.gat(x, edge_index),
-            'sage': self.sage(x, edge_index),
-            'gin': self.gin(x, edge_index),
-            'cheb': self.cheb(x, edge_index),
-            'arma': self.arma(x, edge_index),
-            'graph': self.graph(x, edge_index),
-            'skip': self.skip(x),
-            'fc': self.fc(x),
-        }
-
-        x_1 = case.get(self.option_list[0])
-        x_1 = torch.relu(x_1)
-        x_1 = F.dropout(x_1, p=self.dropout_frac)
-
-        case2 = {
-            'gcn': self.gcn1(x_1, edge_index),
-            'gat': self.gat1(x_1, edge_index),
-            'sage': self.sage1(x_1, edge_index),
-            'gin': self.gin1(x_1, edge_index),
-            'cheb': self.cheb1(x_1, edge_index),
-            'arma': self.arma1(x_1, edge_index),
-            'graph': self.graph1(x_1, edge_index),
-            'skip': self.skip1(x_1),
-            'fc': self.fc1(x_1),
-        }
-        x_2 = case2.get(self.option_list[1])
-        x_2 = torch.relu(x_2)
-        x_2 = F.dropout(x_2, p=self.dropout_frac)
-
-        case3 = {
-            'gcn': self.gcn1(x_2, edge_index),
-            'gat': self.gat1(x_2, edge_index),
-            'sage': self.sage1(x_2, edge_index),
-            'gin': self.gin1(x_2, edge_index),
-            'cheb': self.cheb1(x_2, edge_index),
-            'arma': self.arma1(x_2, edge_index),
-            'graph': self.graph1(x_2, edge_index),
-            'skip': self.skip1(x_2),
-            'fc': self.fc1(x_2),
-        }
-        x_3 = case3.get(self.option_list[2])
-        x_3 = torch.relu(x_3)
-        x_3 = F.dropout(x_3, p=self.dropout_frac)
-
-        x_4 = case3.get(self.option_list[3])
-        x_4 = torch.relu(x_4)
-        x_4 = F.dropout(x_4, p=self.dropout_frac)
-
-        output = torch.cat((x_3, x_4), dim=1)
-        output = self.fc_out(output)
-        output = torch.sigmoid(output)
-
-        return output
-
-class MyGraphNetwork0123(nn.Module):
-    option_list = None
-    def __init__(self, in_features, out_features, hidden_dim=5, cheb_order=2, dropout=0.1):
-        super(MyGraphNetwork0123, self).__init__()
-        self.gcn = GCNConv(in_features, hidden_dim).to(device1)
-        self.gat = GATConv(in_features, hidden_dim).to(device1)
-        self.sage = SAGEConv(in_features, hidden_dim).to(device1)
-        self.gin = GINConv(nn.Sequential(nn.Linear(in_features, hidden_dim), nn.ReLU())).to(device1)
-        self.cheb = ChebConv(in_features, hidden_dim, cheb_order).to(device1)
-        self.arma = ARMAConv(in_features, hidden_dim).to(device1)
-        self.graph = GraphConv(in_features, hidden_dim).to(device1)
-        self.skip = nn.Linear(in_features, hidden_dim).to(device1)
-        self.fc = nn.Linear(in_features, hidden_dim).to(device1)
-
-        self.gcn1 = GCNConv(hidden_dim, hidden_dim).to(device1)
-        self.gat1 = GATConv(hidden_dim, hidden_dim).to(device1)
-        self.sage1 = SAGEConv(hidden_dim, hidden_dim).to(device1)
-        self.gin1 = GINConv(nn.Sequential(nn.Linear(hidden_dim, hidden_dim), nn.ReLU())).to(device1)
-        self.cheb1 = ChebConv(hidden_dim, hidden_dim, cheb_order).to(device1)
-        self.arma1 = ARMAConv(hidden_dim, hidden_dim).to(device1)
-        self.graph1 = GraphConv(hidden_dim, hidden_dim).to(device1)
-        self.skip1 = nn.Linear(hidden_dim, hidden_dim).to(device1)
-        self.fc1 = nn.Linear(hidden_dim, hidden_dim).to(device1)
-        self.dropout_frac = dropout
-
-        self.fc_out = nn.Linear(hidden_dim, out_features).to(device1)
-
-    def forward(self, data):
-        x, edge_index = data.x, data.edge_index
-        case = {
-            'gcn': self.gcn(x, edge_index),
-            'gat': self.gat(x, edge_index),
-            'sage': self.sage(x, edge_index),
-            'gin': self.gin(x, edge_index),
-            'cheb': self.cheb(x, edge_index),
-            'arma': self.arma(x, edge_index),
-            'graph': self.graph(x, edge_index),
-            'skip': self.skip(x),
-            'fc': self.fc(x),
-        }
-
-        x_1 = case.get(self.option_list[0])
-        x_1 = torch.relu(x_1)
-        x_1 = F.dropout(x_1, p=self.dropout_frac)
-
-        case2 = {
-            'gcn': self.gcn1(x_1, edge_index),
-            'gat': self.gat1(x_1, edge_index),
-            'sage': self.sage1(x_1, edge_index),
-            'gin': self.gin1(x_1, edge_index),
-            'cheb': self.cheb1(x_1, edge_index),
-            'arma': self.arma1(x_1, edge_index),
-            'graph': self.graph1(x_1, edge_index),
-            'skip': self.skip1(x_1),
-            'fc': self.fc1(x_1),
-        }
-        x_2 = case2.get(self.option_list[1])
-        x_2 = torch.relu(x_2)
-        x_2 = F.dropout(x_2, p=self.dropout_frac)
-
-        case3 = {
-            'gcn': self.gcn1(x_2, edge_index),
-            'gat': self.gat1(x_2, edge_index),
-            'sage': self.sage1(x_2, edge_index),
-            'gin': self.gin1(x_2, edge_index),
-            'cheb': self.cheb1(x_2, edge_index),
-            'arma': self.arma1(x_2, edge_index),
-            'graph': self.graph1(x_2, edge_index),
-            'skip': self.skip1(x_2),
-            'fc': self.fc1(x_2),
-        }
-        x_3 = case3.get(self.option_list[2])
-        x_3 = torch.relu(x_3)
-        x_3 = F.dropout(x_3, p=self.dropout_frac)
-
-        case4 = {
-            'gcn': self.gcn1(x_3, edge_index),
-            'gat': self.gat1(x_3, edge_index),
-            'sage': self.sage1(x_3, edge_index),
-            'gin': self.gin1(x_3, edge_index),
-            'cheb': self.cheb1(x_3, edge_index),
-            'arma': self.arma1(x_3, edge_index),
-            'graph': self.graph1(x_3, edge_index),
-            'skip': self.skip1(x_3),
-            'fc': self.fc1(x_3),
-        }
-        x_4 = case4.get(self.option_list[3])
-        x_4 = torch.relu(x_4)
-        x_4 = F.dropout(x_4, p=self.dropout_frac)
-
-        output = self.fc_out(x_4)
-        output = torch.sigmoid(output)
-
-        return output
-
-def get_MyGNN(link):
-    a = str(link)
+def make_op(op, in_features, out_features, cheb_order=2):
+    # 只实例化被选中的那一个操作；gcn / cheb / arma / graph 共享每张图只算一次的传播缓存（见 propagation.py）
     case = {
-        '[0, 0, 0, 0]': MyGraphNetwork0000,
-        '[0, 0, 0, 1]': MyGraphNetwork0001,
-        '[0, 0, 1, 1]': MyGraphNetwork0011,
-        '[0, 0, 1, 2]': MyGraphNetwork0012,
-        '[0, 0, 1, 3]': MyGraphNetwork0013,
-        '[0, 1, 1, 1]': MyGraphNetwork0111,
-        '[0, 1, 1, 2]': MyGraphNetwork0112,
-        '[0, 1, 2, 2]': MyGraphNetwork0122,
-        '[0, 1, 2, 3]': MyGraphNetwork0123,
+        'gcn': lambda: CachedGCNConv(in_features, out_features),
+        'gat': lambda: GATConv(in_features, out_features),
+        'sage': lambda: SAGEConv(in_features, out_features),
+        'gin': lambda: GINConv(nn.Sequential(nn.Linear(in_features, out_features), nn.ReLU())),
+        'cheb': lambda: CachedChebConv(in_features, out_features, cheb_order),
+        'arma': lambda: CachedARMAConv(in_features, out_features),
+        'graph': lambda: CachedGraphConv(in_features, out_features),
+        'skip': lambda: nn.Linear(in_features, out_features),
+        'fc': lambda: nn.Linear(in_features, out_features),
     }
-    Mygnn = case.get(a)
-    return Mygnn
-
+    if op not in case:
+        raise ValueError(f"Unknown operation '{op}', expected one of {list(case.keys())}")
+    return case[op]()
+
+def topological_order(link):
+    # 第 i 个操作（DAG 节点 i+1）以节点 link[i] 为输入；每次取编号最小的就绪节点，单调的 link 即按顺序执行
+    n = len(link)
+    for i, src in enumerate(link):
+        if not 0 <= src <= n or src == i + 1:
+            raise ValueError(f"Invalid link {list(link)}: operation {i} reads from node {src}")
+    done = {0}
+    order = []
+    while len(order) < n:
+        ready = [i for i in range(n) if i + 1 not in done and link[i] in done]
+        if not ready:
+            raise ValueError(f"Invalid link {list(link)}: the operations form a cycle")
+        order.append(ready[0])
+        done.add(ready[0] + 1)
+    return order
+
+def output_nodes(link):
+    # 没有被任何操作当作输入的节点，拼接后作为 fc_out 的输入
+    return [j for j in range(1, len(link) + 1) if j not in link]
+
+def op_name(op, src):
+    # 读输入特征的操作命名为 op，读隐藏层的命名为 op + '1'
+    return op if src == 0 else op + '1'
+
+def dag_forward(net, data, link, option_list, order, op_names, outputs, fc_out, dropout):
+    # 按拓扑序执行 (link, option_list) 描述的 DAG，操作模块按名字从 net 上取；MyGraphNetwork 和 supernet 共用
+    x, edge_index = data.x, data.edge_index
+    nodes = {0: x}
+    computed = {}   #同一个操作作用在同一个输入上只计算一次
+    for i in order:
+        op, src, name = option_list[i], link[i], op_names[i]
+        if (name, src) not in computed:
+            module = getattr(net, name)
+            if op in ('fc', 'skip'):
+                computed[(name, src)] = module(nodes[src])
+            else:
+                computed[(name, src)] = module(nodes[src], edge_index)
+        x_i = torch.relu(computed[(name, src)])
+        x_i = F.dropout(x_i, p=dropout)
+        nodes[i + 1] = x_i
+
+    output = torch.cat([nodes[j] for j in outputs], dim=1)
+    output = fc_out(output)
+    output = torch.sigmoid(output)
+
+    return output
+
+class MyGraphNetwork(nn.Module):
+    """
+    由 link 和 option_list 编译出的 CO 模型，替代原先手写的 MyGraphNetwork0000 ... MyGraphNetwork0123
+    只实例化被选中的操作：读输入特征的操作命名为 op，读隐藏层的命名为 op + '1'，同名操作共享参数，
+    因此 state_dict 的键和原先手写的类一致
+    """
+    def __init__(self, in_features, out_features, link, option_list, hidden_dim=5, cheb_order=2, dropout=0.1):
+        super(MyGraphNetwork, self).__init__()
+        if len(link) != len(option_list):
+            raise ValueError(f"link {list(link)} and option_list {list(option_list)} must have the same length")
+        self.link = list(link)
+        self.option_list = list(option_list)
+        self.order = topological_order(self.link)
+        self.outputs = output_nodes(self.link)
+        self.op_names = []
+        for op, src in zip(self.option_list, self.link):
+            name = op_name(op, src)
+            if not hasattr(self, name):
+                in_ = in_features if src == 0 else hidden_dim
+                self.add_module(name, make_op(op, in_, hidden_dim, cheb_order).to(device1))
+            self.op_names.append(name)
+        self.fc_out = nn.Linear(hidden_dim * len(self.outputs), out_features).to(device1)
+        self.dropout_frac = dropout
 
-def get_acc_list(link, all_egdes, option_list):
+    def forward(self, data):
+        return dag_forward(self, data, self.link, self.option_list, self.order, self.op_names, self.outputs,
+                           self.fc_out, self.dropout_frac)
+
+def get_MyGNN(link, option_list):
+    # 返回一个 (in_features, out_features) -> 模型 的构造函数，供 create_gnn.get_gnn_params 使用
+    return partial(MyGraphNetwork, link=list(link), option_list=list(option_list))
+
+
+def train_candidate(model, edge_index, n_nodes, Q, IterNum=1, in_features=369, polish=False,
+                    n_samples=0, sync_every=1, max_epochs=None, mis_penalties=None):
+    """
+    训练一个候选架构 IterNum 次，返回 (最优割值, 对应的比特串列表, 未做局部搜索时的最优割值)
+    polish=True 时对每个重启的最优比特串再做 贪心 + 禁忌 局部搜索（见 local_search.polish_bitstring）
+    n_samples > 0 时训练结束后再做批量随机取整（见 rounding.best_rounding）
+    sync_every > 1 时使用每 sync_every 个 epoch 才同步一次的训练循环（见 create_gnn.run_gnn_training_sync_free）
+    max_epochs 限制每次训练的 epoch 数（默认 create_gnn.number_epochs），供 successive halving 使用
+    mis_penalties 不为 None 时改为求解最大独立集（见 train_candidate_mis），Q 中只使用边的位置
+    """
+    if mis_penalties is not None:
+        return train_candidate_mis(model, edge_index, n_nodes, Q, mis_penalties, in_features, n_samples, max_epochs)
+    cut_vals = []
+    best_solutiuon_dict = {0: 0}
+
+    best_bitstrings = []
+    for i in range(IterNum):
+        print(i)
+        print('Running GNN...')
+        net, embed, optimizer = create_gnn.get_gnn_params(in_features, 1, n_nodes, model)
+        gnn_start = time()
+
+        net, epoch, final_bitstring, best_bitstring, losses, epochs = create_gnn.run_gnn_training_GPT4GNAS(
+            embed,
+            None,
+            Q, net,
+            optimizer,
+            edge_index,
+            n_samples,
+            sync_every,
+            max_epochs)
+
+        gnn_time = time() - gnn_start
+        best_bitstrings.append(best_bitstring)
+
+    raw_cut_vals = []
+    S_diag = symmetric_qubo(Q) if polish else None
+    for best_bitstring in best_bitstrings:
+        best_bitstring = best_bitstring.type(dtype)
+        best_bitstring = best_bitstring.to(device1)
+
+        cut_value_from_training = -loss_func(best_bitstring, Q)
+        raw_cut_vals.append(cut_value_from_training)
+        if polish:
+            polished, raw_energy, energy = polish_bitstring(Q, best_bitstring, S_diag=S_diag)
+            print(f'local search: cut {-raw_energy} -> {-energy}')
+            best_bitstring = torch.tensor(polished, dtype=dtype, device=device1)
+            cut_value_from_training = -loss_func(best_bitstring, Q)
+        bitstring_list = list(best_bitstring)
+        cut_vals.append(cut_value_from_training)
+
+        if cut_value_from_training > list(best_solutiuon_dict.keys())[0]:
+            best_solutiuon_dict[cut_value_from_training] = best_solutiuon_dict.pop(
+                list(best_solutiuon_dict.keys())[0])
+            best_solutiuon_dict[cut_value_from_training] = bitstring_list
+
+    result = float(max(cut_vals))
+    return result, list(best_solutiuon_dict.values())[0], float(max(raw_cut_vals))
+
+
+def train_candidate_mis(model, edge_index, n_nodes, Q, penalties, in_features=369, n_samples=0, max_epochs=None):
+    """
+    最大独立集：len(penalties) 个惩罚系数各用一个独立的模型逐个训练（QUBO 见 mis.mis_qubo_batch），
+    每个惩罚系数的最优比特串都修复为极大独立集（见 mis.repair_independent_set），取最大的一个
+    返回 (独立集大小, 比特串列表, 只删去冲突节点时的独立集大小)，与 train_candidate 的返回格式一致
+    """
+    penalties = list(penalties)
+    Q_batch = mis_qubo_batch(Q, penalties)
+    best_bitstrings = []
+    for k, penalty in enumerate(penalties):
+        print(f'Running GNN for MIS penalty {penalty}...')
+        net, embed, optimizer = create_gnn.get_gnn_params(in_features, 1, n_nodes, model)
+        net, epoch, final_bitstring, best_bitstring, losses, epochs = create_gnn.run_gnn_training_GPT4GNAS(
+            embed,
+            None,
+            qubo_slice(Q_batch, k), net,
+            optimizer,
+            edge_index,
+            n_samples,
+            1,
+            max_epochs)
+        best_bitstrings.append(best_bitstring)
+    return _best_independent_set(Q, n_nodes, penalties, best_bitstrings)
+
+
+def _best_independent_set(Q, n_nodes, penalties, best_bitstrings):
+    # 每个惩罚系数的最优比特串修复为极大独立集，返回最大的一个 (独立集大小, 比特串列表, 只删去冲突节点时的独立集大小)
+    A = adjacency(Q, n_nodes)
+    best = None
+    for penalty, bitstring in zip(penalties, best_bitstrings):
+        repaired, conflict_free = repair_independent_set(A, bitstring)
+        print(f'penalty {penalty}: GNN {int(bitstring.sum())} nodes, conflict-free {conflict_free.sum()}, '
+              f'repaired {repaired.sum()}')
+        if best is None or repaired.sum() > best[0].sum():
+            best = (repaired, conflict_free)
+    repaired, conflict_free = best
+    return float(repaired.sum()), list(repaired), float(conflict_free.sum())
+
+
+def train_candidate_warm(model, edge_index, n_nodes, Q, parent_state=None, warm_epochs=None, in_features=369,
+                         polish=False, n_samples=0, sync_every=1, max_epochs=None, IterNum=1):
+    """
+    热启动版本的 train_candidate，只训练一次（IterNum 被忽略），返回 (割值, 比特串列表, 原始割值, state)
+    parent_state 为 warm_start.export_state 的结果时，先继承其中同名操作模块和节点嵌入，再按继承的参数比例
+    训练 warm_epochs（全部继承）到 max_epochs（什么都没继承）之间的 epoch 数（见 warm_start.warm_budget）
+    state 为训练后的参数，供 warm_start.WeightBank 保存以作为之后候选的父代
+    """
+    net, embed, optimizer = create_gnn.get_gnn_params(in_features, 1, n_nodes, model)
+    if parent_state is not None:
+        inherited = load_parent_state(net, embed, parent_state)
+        max_epochs = warm_budget(net, inherited, warm_epochs, max_epochs or create_gnn.number_epochs)
+        print(f'Warm start: inherited {inherited}, training for {max_epochs} epochs')
+    net, epoch, final_bitstring, best_bitstring, losses, epochs = create_gnn.run_gnn_training_GPT4GNAS(
+        embed,
+        None,
+        Q, net,
+        optimizer,
+        edge_index,
+        n_samples,
+        sync_every,
+        max_epochs)
+
+    best_bitstring = best_bitstring.type(dtype).to(device1)
+    raw_result = float(-loss_func(best_bitstring, Q))
+    result = raw_result
+    if polish:
+        polished, raw_energy, energy = polish_bitstring(Q, best_bitstring)
+        print(f'local search: cut {-raw_energy} -> {-energy}')
+        best_bitstring = torch.tensor(polished, dtype=dtype, device=device1)
+        result = float(-loss_func(best_bitstring, Q))
+    return result, list(best_bitstring), raw_result, export_state(net, embed)
+
+
+def _to_cpu(obj):
+    # state_dict（包括优化器的嵌套 dict / list）中的张量复制到 CPU，便于保存和在进程间传递
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().cpu().clone()
+    if isinstance(obj, dict):
+        return {key: _to_cpu(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_to_cpu(value) for value in obj]
+    return obj
+
+
+def _resume_run(model, edge_index, n_nodes, Q, state, max_epochs, in_features, n_samples, sync_every):
+    """
+    一次可续训的训练，返回 (best_bitstring, state)：state 为 None 时新建参数训练 max_epochs 个 epoch，
+    否则从 state 恢复网络、节点嵌入和 Adam 状态，只再训练 max_epochs - state['epochs'] 个 epoch
+    best_bitstring 取历次训练中损失最低的；已早停的训练不再继续
+    """
+    trained = 0 if state is None else state['epochs']
+    if state is not None and (state['stopped'] or trained >= max_epochs):
+        return state['best_bitstring'].to(device1), state
+    net, embed, optimizer = create_gnn.get_gnn_params(in_features, 1, n_nodes, model)
+    if state is not None:
+        net.load_state_dict(state['net'])
+        embed.load_state_dict(state['embed'])
+        optimizer.load_state_dict(state['optimizer'])
+        print(f'Resuming after {trained} epochs, training for {max_epochs - trained} more')
+    net, epoch, final_bitstring, best_bitstring, losses, epochs = create_gnn.run_gnn_training_GPT4GNAS(
+        embed,
+        None,
+        Q, net,
+        optimizer,
+        edge_index,
+        n_samples,
+        sync_every,
+        max_epochs - trained)
+
+    best_bitstring = best_bitstring.type(dtype).to(device1)
+    best_loss = float(loss_func(best_bitstring, Q))
+    if state is not None and state['best_loss'] <= best_loss:
+        best_bitstring, best_loss = state['best_bitstring'].to(device1), state['best_loss']
+    state = {'net': _to_cpu(net.state_dict()), 'embed': _to_cpu(embed.state_dict()),
+             'optimizer': _to_cpu(optimizer.state_dict()), 'best_bitstring': best_bitstring.cpu(),
+             'best_loss': best_loss, 'epochs': trained + epoch + 1, 'stopped': epoch + 1 < max_epochs - trained}
+    return best_bitstring, state
+
+
+def train_candidate_resume(model, edge_index, n_nodes, Q, state=None, max_epochs=None, in_features=369,
+                           polish=False, n_samples=0, sync_every=1, mis_penalties=None, IterNum=1):
+    """
+    可续训的 train_candidate，只训练一次（IterNum 被忽略），返回 (割值, 比特串列表, 原始割值, state)，供 successive halving 使用
+    state 为上一次调用返回的 state 时接着训练，累计训练到 max_epochs 个 epoch（默认 create_gnn.number_epochs）
+    mis_penalties 不为 None 时每个惩罚系数各有一个可续训的模型（state 为列表），结果的选取与 train_candidate_mis 相同
+    """
+    if max_epochs is None:
+        max_epochs = create_gnn.number_epochs
+    if mis_penalties is not None:
+        penalties = list(mis_penalties)
+        Q_batch = mis_qubo_batch(Q, penalties)
+        states = state if state is not None else [None] * len(penalties)
+        runs = [_resume_run(model, edge_index, n_nodes, qubo_slice(Q_batch, k), states[k], max_epochs, in_features,
+                            n_samples, 1) for k in range(len(penalties))]
+        result, best_solution, raw_result = _best_independent_set(Q, n_nodes, penalties, [b for b, st in runs])
+        return result, best_solution, raw_result, [st for b, st in runs]
+
+    best_bitstring, state = _resume_run(model, edge_index, n_nodes, Q, state, max_epochs, in_features, n_samples,
+                                        sync_every)
+    raw_result = float(-loss_func(best_bitstring, Q))
+    result = raw_result
+    if polish:
+        polished, raw_energy, energy = polish_bitstring(Q, best_bitstring)
+        print(f'local search: cut {-raw_energy} -> {-energy}')
+        best_bitstring = torch.tensor(polished, dtype=dtype, device=device1)
+        result = float(-loss_func(best_bitstring, Q))
+    return result, list(best_bitstring), raw_result, state
+
+
+def _train_candidates_resume(states, pool, graph, link, gnn_list, seeds, **train_kwargs):
+    # evaluate_candidates 的 train_fn：从 states（规范化后的操作元组 -> state）接着训练，并把新的 state 写回 states
+    prev_states = [states.get(tuple(ops)) for ops in gnn_list]
+    if pool is not None:
+        print(f'Dispatching {len(gnn_list)} candidates to {pool.n_workers} workers')
+        fresh = pool.evaluate_resume(link, gnn_list, prev_states, seeds, **train_kwargs)
+    else:
+        edge_index, n_nodes, Q = load_local_graph() if graph is None else graph
+        fresh = []
+        for sublist, seed, state in zip(gnn_list, seeds, prev_states):
+            if seed is not None:
+                torch.manual_seed(seed)
+            print(f'Running experiment for model:{sublist}')
+            start = time()
+            result, best_solution, raw_result, state = train_candidate_resume(
+                get_MyGNN(link, sublist), edge_index, n_nodes, Q, state, **train_kwargs)
+            fresh.append((result, best_solution, raw_result, time() - start, state))
+
+    results = []
+    for sublist, (result, best_solution, raw_result, wall_time, state) in zip(gnn_list, fresh):
+        states[tuple(sublist)] = state
+        results.append((result, best_solution, raw_result, wall_time))
+    return results
+
+
+def load_local_graph():
+    # 图只解析一次，且命中磁盘缓存时直接内存映射读取
+    print("G14 dataset")
+    edge_index, n_nodes, n_edges, Q = load_graph(graph_path)
+    edge_index = torch.tensor(edge_index, dtype=torch.long, device=device1)
+    return edge_index, n_nodes, qubo_edge_list(Q, device=device1)
+
+
+def training_config(pool=None, **train_kwargs):
+    # 参与结果缓存键的训练配置：create_gnn 的超参数 + 创建 pool 时的参数 + 本次调用的参数
+    config = {'number_epochs': create_gnn.number_epochs, 'patience': create_gnn.patience, 'tol': create_gnn.tol,
+              'learning_rate': create_gnn.learning_rate, 'prob_threshold': create_gnn.prob_threshold}
+    if pool is not None:
+        config.update(pool.train_kwargs)
+    config.update(train_kwargs)
+    # 不限制 max_epochs 与显式给出完整预算是同一个配置
+    config['max_epochs'] = config.get('max_epochs') or create_gnn.number_epochs
+    return config
+
+
+def _train_candidates_warm(link, gnn_list, seeds, bank, parents, pool=None, graph=None, **train_kwargs):
+    # 每个候选训练后都存入 bank；parents 为 evaluate_candidates 选出的父代（bank.closest 的结果），None 表示从头训练
+    for ops, parent in zip(gnn_list, parents):
+        if parent is not None:
+            print(f'Warm start for model:{ops} from {parent[0]} (distance {parent[2]})')
+    parent_states = [None if parent is None else parent[1] for parent in parents]
+    train_kwargs['warm_epochs'] = bank.warm_epochs
+    if pool is not None:
+        print(f'Dispatching {len(gnn_list)} candidates to {pool.n_workers} workers')
+        fresh = pool.evaluate_warm(link, gnn_list, parent_states, seeds, **train_kwargs)
+    else:
+        edge_index, n_nodes, Q = load_local_graph() if graph is None else graph
+        fresh = []
+        for sublist, seed, parent_state in zip(gnn_list, seeds, parent_states):
+            if seed is not None:
+                torch.manual_seed(seed)
+            print(f'Running experiment for model:{sublist}')
+            start = time()
+            result, best_solution, raw_result, state = train_candidate_warm(
+                get_MyGNN(link, sublist), edge_index, n_nodes, Q, parent_state, **train_kwargs)
+            fresh.append((result, best_solution, raw_result, time() - start, state))
+
+    results = []
+    for sublist, (result, best_solution, raw_result, wall_time, state) in zip(gnn_list, fresh):
+        bank.add(sublist, result, state)
+        results.append((result, best_solution, raw_result, wall_time))
+    return results
+
+
+def _train_candidates(link, gnn_list, seeds, pool=None, graph=None, bank=None, parents=None, **train_kwargs):
+    # 返回 [(cut, best_bitstring, raw_cut, wall_time), ...]
+    if not gnn_list:
+        return []
+    if bank is not None:
+        return _train_candidates_warm(link, gnn_list, seeds, bank, parents, pool, graph, **train_kwargs)
+    if pool is not None:
+        print(f'Dispatching {len(gnn_list)} candidates to {pool.n_workers} workers')
+        return pool.evaluate(link, gnn_list, seeds, **train_kwargs)
+    edge_index, n_nodes, Q = load_local_graph() if graph is None else graph
+    results = []
+    for sublist, seed in zip(gnn_list, seeds):
+        if seed is not None:
+            torch.manual_seed(seed)
+        model = get_MyGNN(link, sublist)
+        print(f'Running experiment for model:{sublist}')
+        print("begin coding")
+        start = time()
+        result, best_solution, raw_result = train_candidate(model, edge_index, n_nodes, Q, **train_kwargs)
+        results.append((result, best_solution, raw_result, time() - start))
+    return results
+
+
+def evaluate_candidates(link, gnn_list, pool=None, graph=None, cache=None, seeds=None, bank=None, warm_start=False,
+                        train_fn=None, graph_file=None, config=None, **train_kwargs):
+    """
+    按提交顺序返回 [(cut, best_bitstring, raw_cut), ...]；pool 为 None 时在本进程内逐个训练
+    候选先按 link 的自同构规范化（见 canonical.canonical_ops），同一批中同构或重复的架构只训练一次
+    cache 为 result_cache.ResultCache 时，命中的架构直接返回缓存结果，新结果连同训练耗时写回缓存
+    bank 为 warm_start.WeightBank 时保存训练后的参数；warm_start=True 时新候选从 bank 中最接近的父代热启动
+    train_fn 不为 None 时代替默认的训练：train_fn(link, gnn_list, seeds, **train_kwargs) 返回
+    [(cut, best_bitstring, raw_cut, wall_time), ...]（如 supernet 的 one-shot 打分），规范化、去重和缓存与默认训练相同
+    graph_file 为缓存键使用的图文件（默认为 pool 或本进程的图），config 为额外参与缓存键的配置
+    使用 bank 时缓存键中还带有父代的操作列表（从头训练时为 None）和热启动的 warm_epochs，同一架构冷启动和从不同父代热启动的结果分开缓存
+    """
+    if seeds is None:
+        seeds = [None] * len(gnn_list)
+    gnn_list = [canonical_ops(link, ops) for ops in gnn_list]
+    parents = [bank.closest(ops) if bank is not None and warm_start else None for ops in gnn_list]
+    keys = [(tuple(ops), seed) for ops, seed in zip(gnn_list, seeds)]
+    results = [None] * len(gnn_list)
+    if cache is not None:
+        if graph_file is None:
+            graph_file = pool.graph_path if pool is not None else graph_path
+        config = dict(training_config(pool, **train_kwargs), **(config or {}))
+        configs = [config] * len(gnn_list)
+        if bank is not None:
+            configs = [dict(config, parent=None) if parent is None else
+                       dict(config, parent=list(parent[0]), warm_epochs=bank.warm_epochs) for parent in parents]
+        keys = [result_key(graph_file, link, ops, seed, cfg) for ops, seed, cfg in zip(gnn_list, seeds, configs)]
+        for i, key in enumerate(keys):
+            hit = cache.get(key)
+            if hit is not None:
+                print(f'Cached result for model:{gnn_list[i]} ', hit[0])
+                results[i] = hit[:3]
+
+    todo = {}
+    for i, key in enumerate(keys):
+        if results[i] is None:
+            todo.setdefault(key, []).append(i)
+    firsts = [indices[0] for indices in todo.values()]
+    if train_fn is not None:
+        fresh = train_fn(link, [gnn_list[i] for i in firsts], [seeds[i] for i in firsts], **train_kwargs)
+    else:
+        fresh = _train_candidates(link, [gnn_list[i] for i in firsts], [seeds[i] for i in firsts], pool, graph,
+                                  bank, [parents[i] for i in firsts], **train_kwargs)
+    for (key, indices), (result, best_solution, raw_result, wall_time) in zip(todo.items(), fresh):
+        if cache is not None:
+            parent = parents[indices[0]]
+            cache.put(key, result, best_solution, raw_result, wall_time, link=list(link),
+                      ops=list(gnn_list[indices[0]]), seed=seeds[indices[0]],
+                      parent=None if parent is None else list(parent[0]))
+        for i in indices:
+            results[i] = (result, best_solution, raw_result)
+    return results
+
+
+def rank_by_proxy(link, gnn_list, percentile, graph=None, **proxy_kwargs):
+    """
+    训练前用零成本代理（见 proxy.proxy_scores）给候选打分，返回 (保留的下标, 推迟的下标, 综合分数)
+    综合分数低于 percentile 分位数的候选被推迟；代理只做几步前向/反向，在本进程内计算
+    """
+    edge_index, n_nodes, Q = load_local_graph() if graph is None else graph
+    scores = []
+    for sublist in gnn_list:
+        scores.append(proxy_scores(get_MyGNN(link, sublist), edge_index, n_nodes, Q, **proxy_kwargs))
+        print(f'proxy scores of:{sublist} ', scores[-1])
+    combined = combine_scores(scores)
+    keep, deferred = split_by_percentile(combined, percentile)
+    print(f'Proxy keeps {[gnn_list[i] for i in keep]}, defers {[gnn_list[i] for i in deferred]}')
+    return keep, deferred, combined
+
+
+def get_acc_list(link, all_egdes, option_list, pool=None, output_file="experiment.txt", cache=None, bank=None,
+                 warm_start=False, store=None, iteration=0, **train_kwargs):
+    """
+    train_kwargs 原样传给 train_candidate（IterNum、in_features、polish、n_samples 等）
+    pool 为 evaluator_pool.EvaluatorPool 时，候选架构分发到常驻进程池并行训练，结果按提交顺序返回
+    （此时 train_kwargs 只覆盖创建 pool 时传入的对应参数）
+    做了局部搜索时 acc 按搜索后的割值计算，结果文件中同时记录原始割值
+    cache 为 result_cache.ResultCache 时，已训练过的架构直接复用缓存结果（见 evaluate_candidates）
+    bank / warm_start 用于 exploitation 阶段的父代权重热启动（见 warm_start.WeightBank）
+    store 为 results_store.ResultsStore 时，这一批结果作为第 iteration 轮一次写入结果库；output_file 为 None 时不写文本文件
+    """
     gnn_list = option_list
     all_best_result = []
     acc_list = []
-    for sublist in gnn_list:
-        model = get_MyGNN(link)
-        model.option_list = sublist
-        # model_class, file_lock = args
-        print(f'Running experiment for model:{model.option_list}')
-        print("begin coding")
+    raw_results = []
 
-        IterNum = 1
+    results = evaluate_candidates(link, gnn_list, pool, cache=cache, bank=bank, warm_start=warm_start, **train_kwargs)
 
-        dim_embedding = 369
-        in_features = dim_embedding
-
-        print("G14 dataset")
-        data = open("../G14.txt", 'r')
-        reader = csv.reader(data)
-        allRows = [list(map(int, row[0].split())) for row in reader]  # allRows is a list of Graph
-        allRows = allRows[1:]
-        for i in range(len(allRows)):
-            del allRows[i][2]
-        allRows = list(map(tuple, allRows))
+    for sublist, (result, best_solution, raw_result) in zip(gnn_list, results):
+        print(f"the best result of:{sublist} ", result)
+        if raw_result != result:
+            print(f"the raw GNN result of:{sublist} ", raw_result)
+        all_best_result.append(result)
+        raw_results.append(raw_result)
+        acc = result / all_egdes
+        acc_list.append(acc)
+        if output_file is None:
+            continue
+        with open(output_file, "a") as file:
+            if raw_result != result:
+                file.write(str(sublist) + "     " + str(result) + "     raw: " + str(raw_result) + "\n")
+            else:
+                file.write(str(sublist) + "     " + str(result) + "\n")
+
+    if store is not None:
+        store.add_batch(graph_name(graph_path if pool is None else pool.graph_path), link, iteration, gnn_list,
+                        acc_list, all_best_result, raw_results)
+    print(all_best_result)
+    print(acc_list)
 
-        edge_index, graph_dgl, G, n_nodes = get_edge_index(allRows)
+    return acc_list
 
-        A = jnp.array(nx.to_numpy_array(G))
-        Q = create_Q_matrix(G)
-        Q = Q.to(device1)
 
-        net, embed, optimizer = create_gnn.get_gnn_params(in_features, 1, n_nodes, model)
+def get_acc_list_halving(link, all_egdes, option_list, pool=None, output_file="experiment.txt", eta=3,
+                         min_epochs=500, cache=None, store=None, iteration=0, **train_kwargs):
+    """
+    successive halving 版本的 get_acc_list：所有候选先训练 min_epochs 个 epoch，按割值保留前 1/eta，
+    存活者从上一轮结束时的网络、节点嵌入和 Adam 状态接着训练到 eta 倍的累计 epoch 预算（见 train_candidate_resume），
+    直到只剩一个候选，最后一轮总是累计到完整的 create_gnn.number_epochs，因此最终候选的训练量与单保真度路径相同
+    （命中结果缓存的候选没有可续训的状态，进入下一轮时从头训练到该轮的预算）
+    返回 (acc_list, fidelity_list)：acc 取每个候选到达的最高一轮的结果，fidelity 为累计训练的预算占完整预算的比例（1.0 为完整训练）
+    store / iteration / output_file 的含义与 get_acc_list 相同
+    """
+    n_candidates = len(option_list)
+    full_epochs = create_gnn.number_epochs
+    graph = load_local_graph() if pool is None else None
+    results = [None] * n_candidates
+    budgets = [0] * n_candidates
+    states = {}     #规范化后的操作元组 -> 存活候选的训练状态
+    train_fn = partial(_train_candidates_resume, states, pool, graph)
+
+    survivors = list(range(n_candidates))
+    budget = min_epochs
+    while survivors:
+        if len(survivors) == 1 or budget >= full_epochs:
+            budget = full_epochs
+        print(f'Successive halving: {len(survivors)} candidates for {budget} epochs')
+        rung = evaluate_candidates(link, [option_list[i] for i in survivors], pool, graph, cache,
+                                   train_fn=train_fn, config={'resumable': True}, max_epochs=budget, **train_kwargs)
+        for i, res in zip(survivors, rung):
+            results[i] = res
+            budgets[i] = budget
+        if budget == full_epochs:
+            break
+        survivors = sorted(survivors, key=lambda i: results[i][0], reverse=True)[:max(1, len(survivors) // eta)]
+        # 被淘汰的候选不再续训，释放它们的状态
+        kept = {tuple(canonical_ops(link, option_list[i])) for i in survivors}
+        for key in list(states):
+            if key not in kept:
+                del states[key]
+        budget *= eta
 
-        cut_vals = []
-        best_solutiuon_dict = {0: 0}
-
-        for i in range(IterNum):
-            print(i)
-            print('Running GNN...')
-            net, embed, optimizer = create_gnn.get_gnn_params(in_features, 1, n_nodes, model)
-            gnn_start = time()
-
-            net, epoch, final_bitstring, best_bitstring, losses, epochs = create_gnn.run_gnn_training_GPT4GNAS(
-                embed,
-                graph_dgl,
-                Q, net,
-                optimizer,
-                edge_index)
-
-            gnn_time = time() - gnn_start
-            bitstring_list = list(best_bitstring)
-
-            best_bitstring = best_bitstring.type(dtype)
-            best_bitstring = best_bitstring.to(device1)
-            # q_torch_long = Q.type(torch.LongTensor)
-            q_torch_long = Q.type(dtype)
-            q_torch_long = q_torch_long.to(device1)
-
-            cut_value_from_training = -(best_bitstring.T @ q_torch_long @ best_bitstring)
-            cut_vals.append(cut_value_from_training)
-
-            if cut_value_from_training > list(best_solutiuon_dict.keys())[0]:
-                best_solutiuon_dict[cut_value_from_training] = best_solutiuon_dict.pop(
-                    list(best_solutiuon_dict.keys())[0])
-                best_solutiuon_dict[cut_value_from_training] = bitstring_list
-        print(f"the best result of:{model.option_list} ", max(cut_vals))
-        result = max(cut_vals)
-        result = float(result)
+    all_best_result = []
+    acc_list = []
+    fidelity_list = []
+    for sublist, (result, best_solution, raw_result), epochs in zip(option_list, results, budgets):
+        print(f"the best result of:{sublist} after {epochs} epochs ", result)
         all_best_result.append(result)
-        acc = result / all_egdes
-        acc_list.append(acc)
-        with open("experiment.txt", "a") as file:
-            file.write(str(model.option_list) + "     " + str(result) + "\n")
-
+        acc_list.append(result / all_egdes)
+        fidelity_list.append(epochs / full_epochs)
+        if output_file is None:
+            continue
+        with open(output_file, "a") as file:
+            line = str(sublist) + "     " + str(result)
+            if raw_result != result:
+                line += "     raw: " + str(raw_result)
+            file.write(line + "     epochs: " + str(epochs) + "\n")
+
+    if store is not None:
+        store.add_batch(graph_name(graph_path if pool is None else pool.graph_path), link, iteration, option_list,
+                        acc_list, all_best_result, [res[2] for res in results], fidelity_list, method='halving')
     print(all_best_result)
     print(acc_list)
 
-    return acc_list
+    return acc_list, fidelity_list
+
+
+def load_graph_batch(paths):
+    """
+    读取多张图并拼成不相交并图，返回 (edge_index, offsets, q_list, n_edges_list)
+    第 g 张图的节点为 offsets[g]:offsets[g+1]，q_list[g] 为该图局部编号的 (row, col, weight, diag)
+    """
+    edge_indices, q_list, n_edges_list = [], [], []
+    offsets = [0]
+    for path in paths:
+        edge_index, n_nodes, n_edges, Q = load_graph(path)
+        edge_indices.append(np.asarray(edge_index) + offsets[-1])
+        q_list.append(qubo_edge_list(Q, device=device1))
+        n_edges_list.append(n_edges)
+        offsets.append(offsets[-1] + n_nodes)
+    edge_index = torch.tensor(np.concatenate(edge_indices, axis=1), dtype=torch.long, device=device1)
+    return edge_index, offsets, q_list, n_edges_list
+
+
+def train_candidate_multi_graph(model, edge_index, offsets, q_list, in_features=369, polish=False, n_samples=0,
+                                max_epochs=None):
+    """
+    一次训练同时得到候选架构在多张图上的结果（见 create_gnn.run_gnn_training_multi_graph），
+    返回 [(割值, 未做局部搜索时的割值, 比特串), ...]，顺序与 q_list 一致
+    """
+    net, embed, optimizer = create_gnn.get_gnn_params(in_features, 1, offsets[-1], model)
+    net, epoch, final_bitstring, best_bitstring, best_loss, losses, epochs = create_gnn.run_gnn_training_multi_graph(
+        embed,
+        q_list, net,
+        optimizer,
+        edge_index,
+        offsets,
+        n_samples,
+        max_epochs)
+
+    results = []
+    for g, Q in enumerate(q_list):
+        bitstring = best_bitstring[offsets[g]:offsets[g + 1]].type(dtype).to(device1)
+        raw_cut = float(-loss_func(bitstring, Q))
+        cut = raw_cut
+        if polish:
+            polished, raw_energy, energy = polish_bitstring(Q, bitstring)
+            cut = float(-energy)
+            bitstring = polished
+        results.append((cut, raw_cut, bitstring))
+    return results
+
+
+def evaluate_on_graphs(link, option_list, graphs=None, output_file="experiment.txt", cache=None, store=None,
+                       iteration=0, **train_kwargs):
+    """
+    多图模式：候选架构在 graphs（默认 benchmark_graphs）上只训练一次，返回 {图名: 割值}
+    train_kwargs 原样传给 train_candidate_multi_graph（in_features、polish、n_samples、max_epochs）
+    cache 为 result_cache.ResultCache 时每张图的结果分别缓存，键中带有一起训练的图集合，全部命中时不再训练
+    store / iteration / output_file 的含义与 get_acc_list 相同，每张图的结果各写一行
+    """
+    if graphs is None:
+        graphs = benchmark_graphs
+    paths = [os.path.join(benchmark_dir, name + ".txt") for name in graphs]
+    option_list = canonical_ops(link, option_list)
+
+    keys, hits = None, None
+    if cache is not None:
+        config = dict(training_config(**train_kwargs), multi_graph=list(graphs))
+        keys = [result_key(path, link, option_list, None, config) for path in paths]
+        hits = [cache.get(key) for key in keys]
+    if hits is not None and all(hit is not None for hit in hits):
+        print(f'Cached results for model:{option_list} on {list(graphs)}')
+        results = [(hit[0], hit[2]) for hit in hits]
+        n_edges_list = [load_graph(path)[2] for path in paths]
+    else:
+        edge_index, offsets, q_list, n_edges_list = load_graph_batch(paths)
+        print(f'Running experiment for model:{option_list} on {list(graphs)}')
+        start = time()
+        trained = train_candidate_multi_graph(get_MyGNN(link, option_list), edge_index, offsets, q_list,
+                                              **train_kwargs)
+        wall_time = time() - start
+        results = [(cut, raw_cut) for cut, raw_cut, bitstring in trained]
+        if cache is not None:
+            for key, name, (cut, raw_cut, bitstring) in zip(keys, graphs, trained):
+                cache.put(key, cut, bitstring, raw_cut, wall_time, link=list(link), ops=list(option_list), graph=name)
+
+    cuts = {}
+    for name, (cut, raw_cut), n_edges in zip(graphs, results, n_edges_list):
+        print(f"{name}: {cut} / {n_edges} edges")
+        cuts[name] = cut
+    if output_file is not None:
+        with open(output_file, "a") as file:
+            file.write(str(option_list) + "\n")
+            for name, (cut, raw_cut) in zip(graphs, results):
+                line = "    " + name + "     " + str(cut)
+                if raw_cut != cut:
+                    line += "     raw: " + str(raw_cut)
+                file.write(line + "\n")
+    if store is not None:
+        for path, (cut, raw_cut), n_edges in zip(paths, results, n_edges_list):
+            store.add_batch(graph_name(path), link, iteration, [option_list], [cut / n_edges], [cut], [raw_cut],
+                            method='multi-graph')
+    return cuts
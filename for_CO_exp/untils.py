@@ -1,57 +1,97 @@
-def experiments_prompt(arch_list, acc_list, dataname):
+def result_line(arch, acc):
+    # successive halving 提前淘汰的候选带有 fidelity < 1，提示 LLM 该结果只训练了部分 epoch
+    fidelity = arch.get('fidelity', 1.0)
+    if fidelity < 1.0:
+        return 'Model [{}] achieves accuracy {:.4f} on the validation set (stopped early after {:.0%} of the training budget).\n'.format(
+            arch['arch_Operations'], acc, fidelity)
+    return 'Model [{}] achieves accuracy {:.4f} on the validation set.\n'.format(arch['arch_Operations'], acc)
+
+def experiments_prompt(arch_list, acc_list, dataname, store=None, graph=None, link=None, history=None):
+    # 历史结果的来源由调用方选择（见 main.py 的 prompt_source），history 和 store 至多传一个，都不传时使用 arch_list / acc_list
+    # history 为 prompt_history.PromptHistory 时，历史结果取自增量维护的 top_k + 摘要，并受其 token 预算限制
+    # store 为 results_store.ResultsStore 时，历史结果直接从结果库中按索引查询（graph / link 指定哪一次搜索），忽略 arch_list / acc_list
+    if history is not None and store is not None:
+        raise ValueError("pass either history or store as the prompt source, not both")
+    if history is not None:
+        return _history_experiments_prompt(history, dataname)
+    if store is not None:
+        return _store_experiments_prompt(store, graph, link, dataname)
     #print('acc_list', acc_list)#[0.668, 0.7026666666666666, 0.6716666666666667, 0.6829999999999999, 0.684, 0.6553333333333334, 0.6406666666666666, 0.5666666666666668, 0.6783333333333333, 0.6829999999999999, 0.668, 0.7026666666666666, 0.6716666666666667, 0.6829999999999999, 0.684, 0.6553333333333334, 0.6293333333333334, 0.6686666666666667, 0.6666666666666666, 0.6833333333333332]
     #print('arch_list', arch_list)
     arch_list1 = arch_list[:-10]
     arch_list2 = arch_list[-10:]
     acc_list1 = acc_list[:-10]
     acc_list2 = acc_list[-10:]
-    prompt1 = '''\nHere are some experimental results that you can use as a reference:\n'''  # 将 arch_list 和 acc_list 按照 acc_list 的元素大小进行排序
-    if len(acc_list2) > 0:
-        avg_accuracy = sum(acc_list2) / len(acc_list2)
-    else:
-        avg_accuracy = 0
-    prompt2 = '''\nPlease propose 10 better and #different# models with accuracy strictly greater than {}, which can improve the performance of the model on {} in addition to the experimental results mentioned above.\n'''.format(
-        avg_accuracy, dataname)
-    prompt3 = '''\nThe model you propose should be strictly #different# from the structure of the existing experimental results.#You should not raise the models that are already present in the above experimental results again.#\n'''
 
     if(len(arch_list) < 20):
-        prompt_lastround = '''In the previous round of experiments, the models you provided me and their corresponding performance are as follows:\n{}''' \
-            .format(''.join(
-            ['Model [{}] achieves accuracy {:.4f} on the validation set.\n'.format(arch['arch_Operations'], acc) for
-             arch, acc in
-             zip(arch_list, acc_list)]))
-        return prompt_lastround + prompt2 + prompt3
-    prompt_lastround = '''In the previous round of experiments, the models you provided me and their corresponding performance are as follows:\n{}''' \
-        .format(''.join(
-        ['Model [{}] achieves accuracy {:.4f} on the validation set.\n'.format(arch['arch_Operations'], acc) for arch, acc in
-         zip(arch_list2, acc_list2)]))
+        return _format_experiments_prompt(list(zip(arch_list, acc_list)), acc_list2, None, [], dataname)
     sorted_results = sorted(zip(arch_list1, acc_list1), key=lambda x: x[1], reverse=True)
-    arch_list1 = [arch for arch, acc in sorted_results]
-    acc_list1 = [acc for arch, acc in sorted_results]
 
     operation_repeat = []
     seen = set()
     for i in range(len(arch_list)):
-        if tuple(arch_list[i]['arch_Operations']) in seen:
+        # arch_Operations 是字符串，按操作名比较而不是按字符
+        key = tuple(op.strip() for op in arch_list[i]['arch_Operations'].split(','))
+        if key in seen:
             operation_repeat.append(arch_list[i]['arch_Operations'])
         else:
-            seen.add(tuple(arch_list[i]['arch_Operations']))
+            seen.add(key)
+
+    return _format_experiments_prompt(list(zip(arch_list2, acc_list2)), acc_list2, sorted_results, operation_repeat,
+                                      dataname)
+
+def _store_experiments_prompt(store, graph, link, dataname):
+    # 最近一轮、更早轮次按 acc 排好序的结果和重复架构各一次索引查询，不在内存中重新排序
+    latest = store.latest_iteration(graph, link)
+    if latest is None:
+        return _format_experiments_prompt([], [], None, [], dataname)
+    last_round = store.round_results(graph, link, latest)
+    last_accs = [acc for arch, acc in last_round]
+    if store.count(graph, link) < 20:
+        return _format_experiments_prompt(store.history(graph, link), last_accs, None, [], dataname)
+    return _format_experiments_prompt(last_round, last_accs, store.top_k(graph, link, before_iteration=latest),
+                                      store.repeats(graph, link), dataname)
+
+def _history_experiments_prompt(history, dataname):
+    last_round, sorted_results, operation_repeat, summary = history.sections(result_line)
+    last_accs = [acc for arch, acc in last_round]
+    # 还没有更早轮次的结果时（第一轮）只列出最近一轮，不输出空的排序结果部分
+    if not history.top and not history.rest_count:
+        sorted_results = None
+    return _format_experiments_prompt(last_round, last_accs, sorted_results, operation_repeat, dataname, summary)
+
+def _format_experiments_prompt(last_round, last_accs, sorted_results, operation_repeat, dataname, summary=''):
+    # last_round / sorted_results 为 (arch, acc) 列表；sorted_results 为 None 时只列出 last_round（结果还不到 20 个时）
+    # summary 为其余结果的压缩摘要，接在 sorted_results 之后
+    prompt1 = '''\nHere are some experimental results that you can use as a reference:\n'''  # 将 arch_list 和 acc_list 按照 acc_list 的元素大小进行排序
+    if len(last_accs) > 0:
+        avg_accuracy = sum(last_accs) / len(last_accs)
+    else:
+        avg_accuracy = 0
+    prompt2 = '''\nPlease propose 10 better and #different# models with accuracy strictly greater than {}, which can improve the performance of the model on {} in addition to the experimental results mentioned above.\n'''.format(
+        avg_accuracy, dataname)
+    prompt3 = '''\nThe model you propose should be strictly #different# from the structure of the existing experimental results.#You should not raise the models that are already present in the above experimental results again.#\n'''
+
+    prompt_lastround = '''In the previous round of experiments, the models you provided me and their corresponding performance are as follows:\n{}''' \
+        .format(''.join(
+        [result_line(arch, acc) for arch, acc in last_round]))
+    if sorted_results is None:
+        return prompt_lastround + prompt2 + prompt3
 
     prompt_repeat = ''''''
     if(len(operation_repeat)>0):
         prompt_repeat = '''In the above experimental results, there are some repetitive models, as follows\n{}. #Please do not make the mistake of presenting the existing model in the experimental results again!#\n'''.format(''.join(
         ['Model [{}]\n'.format(arch) for arch in operation_repeat]))
 
-    prompt1 = prompt1 + '''{}#I hope you can learn the commonalities between the well performing models to achieve better results and avoid the mistakes of poor models to avoid achieving such poor results again.#\n''' \
+    prompt1 = prompt1 + '''{}{}#I hope you can learn the commonalities between the well performing models to achieve better results and avoid the mistakes of poor models to avoid achieving such poor results again.#\n''' \
         .format(''.join(
-        ['Model [{}] achieves accuracy {:.4f} on the validation set.\n'.format(arch['arch_Operations'], acc) for arch, acc in
-         zip(arch_list1, acc_list1)]))
+        [result_line(arch, acc) for arch, acc in sorted_results]), summary)
 
     #print(prompt_lastround + prompt1 + prompt_repeat + prompt2 + prompt3)
 
     return prompt_lastround + prompt1 + prompt_repeat + prompt2 + prompt3
 
-def main_prompt_word(link, dataname, arch_list=None, acc_list=None, stage=0):
+def main_prompt_word(link, dataname, arch_list=None, acc_list=None, stage=0, store=None, graph=None, history=None):
     struct_dict = {
         (0, 0, 0, 0): '''
     [[0, 1, 1, 1, 1, 0],
@@ -218,6 +258,6 @@ When we have a certain amount of experimental results, we are in the Exploitatio
     if (stage == 0):
         return user_input + notice1 + suffix
     elif (stage < 4):
-        return user_input + experiments_prompt(arch_list, acc_list, dataname) + notice1 + suffix
+        return user_input + experiments_prompt(arch_list, acc_list, dataname, store, graph, link, history) + notice1 + suffix
     else:
-        return user_input + experiments_prompt(arch_list, acc_list, dataname) + notice2 + suffix
+        return user_input + experiments_prompt(arch_list, acc_list, dataname, store, graph, link, history) + notice2 + suffix
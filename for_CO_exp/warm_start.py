@@ -0,0 +1,70 @@
+#Exploitation 阶段的父代权重热启动：新候选从同一 link 下操作最接近（汉明距离）的已训练架构继承同名操作模块和节点嵌入
+#MyGraphNetwork 的模块按操作名（op / op + '1'）命名，因此同名模块的参数形状一致，可以直接复制
+from canonical import link_automorphisms
+
+def hamming(link, ops, parent_ops):
+    # 在 link 的所有自同构下取最小的汉明距离，同构的父代不会因为位置不同而被看作更远
+    best = len(ops)
+    for perm in link_automorphisms(link):
+        permuted = [None] * len(parent_ops)
+        for i, op in enumerate(parent_ops):
+            permuted[perm[i]] = op
+        best = min(best, sum(a != b for a, b in zip(ops, permuted)))
+    return best
+
+class WeightBank(object):
+    """
+    每个 link 各建一个：保存已训练候选的 (ops, cut, state)，state 为 {'net': state_dict, 'embed': state_dict}（CPU 上）
+    只保留割值最高的 max_size 个，以限制内存；warm_epochs 为完全继承父代时的训练预算（见 warm_budget）
+    max_distance 为父代与候选之间的最大汉明距离，更远的架构几乎只有 fc_out 和节点嵌入能继承，此时从头训练
+    """
+    def __init__(self, link, warm_epochs=3000, max_size=20, max_distance=2):
+        self.link = list(link)
+        self.warm_epochs = warm_epochs
+        self.max_size = max_size
+        self.max_distance = max_distance
+        self.entries = []
+
+    def add(self, ops, cut, state):
+        self.entries.append((list(ops), float(cut), state))
+        self.entries.sort(key=lambda entry: entry[1], reverse=True)
+        del self.entries[self.max_size:]
+
+    def closest(self, ops):
+        # 返回 (parent_ops, state, 距离)，距离相同时取割值更高的；库为空或没有距离不超过 max_distance 的父代时返回 None
+        best = None
+        for parent_ops, cut, state in self.entries:
+            distance = hamming(self.link, ops, parent_ops)
+            if distance > self.max_distance:
+                continue
+            if best is None or distance < best[2]:
+                best = (parent_ops, state, distance)
+        return best
+
+def load_parent_state(net, embed, state):
+    """
+    把父代中与 net 同名且形状相同的参数复制进来（同一 link 下 fc_out 总是匹配），节点嵌入整体复制
+    返回被继承的模块名列表
+    """
+    own = net.state_dict()
+    inherited = {key: value for key, value in state['net'].items()
+                 if key in own and own[key].shape == value.shape}
+    own.update(inherited)
+    net.load_state_dict(own)
+    if embed.weight.shape == state['embed']['weight'].shape:
+        embed.load_state_dict(state['embed'])
+    return sorted({key.split('.', 1)[0] for key in inherited})
+
+def export_state(net, embed):
+    return {'net': {k: v.detach().cpu().clone() for k, v in net.state_dict().items()},
+            'embed': {k: v.detach().cpu().clone() for k, v in embed.state_dict().items()}}
+
+def warm_budget(net, inherited, warm_epochs, full_epochs):
+    """
+    按实际继承的参数量决定热启动的 epoch 预算：全部继承时为 warm_epochs，什么都没继承时为 full_epochs，其间线性插值
+    inherited 为 load_parent_state 返回的模块名，比例按 net 的参数元素个数计算（节点嵌入不计入）
+    """
+    total = sum(value.numel() for value in net.state_dict().values())
+    shared = sum(value.numel() for key, value in net.state_dict().items() if key.split('.', 1)[0] in inherited)
+    fraction = shared / total if total else 0.
+    return int(round(warm_epochs + (1 - fraction) * max(full_epochs - warm_epochs, 0)))
@@ -1,60 +1,29 @@
 #from llm4gnas.trainer import TrainerBase
 from torch import Tensor
 from llm4gnas.search_space import GNNBase, Nas_bench_graph_co_GNN
-import csv
+import hashlib
 from typing import Union
 import numpy as np
 import torch
-import dgl
 from itertools import chain
-import networkx as nx
-import scipy.sparse
-from networkx.relabel import convert_node_labels_to_integers
 from torch_geometric.data import Data
-from pyqubo import Array
 import torch.nn as nn
 from llm4gnas.register import model_factory
 from easydict import EasyDict as edict
-
-def create_mis_model(graph, penalty=2):
-    N = graph.number_of_nodes()
-    X = Array.create("X", shape=(N,), vartype="BINARY")
-
-    hamiltonian = -sum(X)
-    for u, v in graph.edges:
-        hamiltonian += penalty * (X[u] * X[v])
-
-    return hamiltonian.compile()
-
-
-###Add by wujunxian
-def create_max_cut_model(graph):
-    N = graph.number_of_nodes()  # 计算图中节点数目
-    X = Array.create("X", shape=(N,), vartype="BINARY")  # 将图中每个节点关联一个二元决策变量X
-
-    hamiltonian = 0
-    for u, v in graph.edges:  # 对边进行筛选
-        hamiltonian -= (X[u] - X[v]) ** 2
-
-    return hamiltonian.compile()
-
-
-def create_Q_matrix(graph, is_max_cut=True):
-    if is_max_cut:
-        model = create_max_cut_model(graph)  # hamiltonian
-    else:
-        model = create_mis_model(graph)
-    N = graph.number_of_nodes()
-    extract_val = lambda x: int(x[2:-1])  # 从变量中提取整数部分
-    Q_matrix = np.zeros((N, N))
-    qubo_dict, _ = model.to_qubo()  # 利用哈密顿量与目标图的信息，计算QUBO的问题矩阵Q
-    for (a, b), quv in qubo_dict.items():  # (a, b) = ('X[1]', 'X[0]'), quv = 2.0
-        u = min(extract_val(a), extract_val(b))
-        v = max(extract_val(a), extract_val(b))
-        Q_matrix[u, v] = quv  # 创造问题矩阵Q
-    Q_matrix = torch.tensor(Q_matrix, dtype=torch.float32)
-
-    return Q_matrix
+import os
+from for_other_dataset_exp.llm4gnas.utils.utils import co_module as _co_module
+
+best_rounding = _co_module('rounding').best_rounding
+co_corefunc = _co_module('co_corefunc')
+# QUBO 的构造和边列表形式与 for_CO_exp 共用同一份实现
+_unique_edges = co_corefunc._unique_edges
+create_mis_qubo = co_corefunc.create_mis_qubo
+create_max_cut_qubo = co_corefunc.create_max_cut_qubo
+create_Q_matrix = co_corefunc.create_Q_matrix
+qubo_edge_list = co_corefunc.qubo_edge_list
+# Gset 的解析和磁盘图缓存也与 for_CO_exp 共用
+load_data = _co_module('load_data')
+graph_cache = _co_module('graph_cache')
 
 class TrainerBase(object):
     def __init__(self, config: dict, **kwargs):
@@ -73,36 +42,38 @@ class TrainerBase(object):
     def predict(self, data: Data, gnn: Union[GNNBase, None] = None) -> Tensor:
         raise NotImplementedError
 
+_graph_memo = {}
+
+
 class COTrainer(TrainerBase):
     def __init__(self, config: dict, **kwargs):
         super().__init__(config, **kwargs)
         self.config = config
 
+    def load_graph(self, data):
+        """
+        data 为 Gset 文件路径或打开的文件时经 for_CO_exp 的 graph_cache.load_graph 读取（按文件内容哈希缓存在磁盘上），
+        否则视为 Gset 文本的行，用 load_data.parse_gset 解析；同一进程内按内容哈希只转换一次
+        返回 (edge_index, n_nodes, Q)，Q 为 (row, col, weight, diag)
+        """
+        path = data if isinstance(data, (str, os.PathLike)) else getattr(data, 'name', None)
+        if path is not None and os.path.isfile(path):
+            key = graph_cache.file_hash(path)
+            if key not in _graph_memo:
+                edge_index, n_nodes, n_edges, Q = graph_cache.load_graph(path)
+                _graph_memo[key] = (torch.tensor(edge_index, dtype=torch.long), n_nodes, qubo_edge_list(Q))
+            return _graph_memo[key]
+
+        text = ''.join(data)
+        key = hashlib.sha1(text.encode()).hexdigest()
+        if key not in _graph_memo:
+            edges, weights, n_nodes, n_edges = load_data.parse_gset(text)
+            edge_index = torch.from_numpy(load_data.gset_edge_index(edges))
+            _graph_memo[key] = (edge_index, n_nodes, qubo_edge_list(co_corefunc.create_sparse_Q(edges, n_nodes)))
+        return _graph_memo[key]
+
     def evaluate(self, data: Data, model: Union[GNNBase, None] = None) -> dict:
-        reader = csv.reader(data)
-        allRows = [list(map(int, row[0].split())) for row in reader]  # allRows is a list of Graph
-        allRows = allRows[1:]
-        for i in range(len(allRows)):
-            del allRows[i][2]
-        allRows = list(map(tuple, allRows))
-        # print(allRows)
-        G = nx.from_edgelist(allRows)
-        G = convert_node_labels_to_integers(G, first_label=0, ordering="default", label_attribute=None)
-        H = nx.Graph()
-        H.add_nodes_from(sorted(G.nodes(data=True)))
-        H.add_edges_from(G.edges(data=True))
-        graph_dgl = dgl.from_networkx(nx_graph=H)
-        graph_dgl = graph_dgl
-        n_nodes = len(G.nodes())
-        A = np.array(nx.to_numpy_array(G))
-        Q = create_Q_matrix(G)
-
-        # 将图数据神经网络的输入
-        adj_matrix = nx.adjacency_matrix(G)
-        coo_matrix = scipy.sparse.coo_matrix(adj_matrix)
-        indices = np.vstack((coo_matrix.row, coo_matrix.col))  # 正真需要的coo形式
-        edge_index_A = torch.LongTensor(indices)
-        edge_index_A = edge_index_A
+        edge_index_A, n_nodes, Q = self.load_graph(data)
         dim_embedding = self.config.in_dim
         embed = nn.Embedding(n_nodes, dim_embedding)
         # embed = embed.type(dtype).to(device1)
@@ -127,8 +98,8 @@ class COTrainer(TrainerBase):
             losses = []
             epochs = []
 
-            best_bitstring = torch.zeros((graph_dgl.number_of_nodes(),)).type(Q.dtype).to(
-                Q.device)  # 初始化全为0一个二进制张量，将图中每个节点关联一个二进制变量x
+            best_bitstring = torch.zeros((n_nodes,)).type(inputs.dtype).to(
+                inputs.device)  # 初始化全为0一个二进制张量，将图中每个节点关联一个二进制变量x
             best_loss = model.loss(prob=best_bitstring.float(), Q=Q)
 
             for epoch in range(self.config.number_epochs):
@@ -160,20 +131,17 @@ class COTrainer(TrainerBase):
                 loss.backward()
                 optimizer.step()
 
-            bitstring_list = list(best_bitstring)
-            # 将张量转换为Long类型
-            best_bitstring_long = best_bitstring.long()
-            Q_long = Q.long()
-
-            # 对张量进行转置
-            transposed_bitstring = best_bitstring_long.permute(*torch.arange(best_bitstring_long.ndim - 1, -1, -1))
+            # optional batched stochastic rounding of the final probabilities, shared with for_CO_exp.create_gnn
+            n_samples = self.config.get('n_round_samples', 0)
+            if n_samples > 0:
+                rounded, rounded_loss = best_rounding(probs, Q, n_samples)
+                if rounded_loss < best_loss:
+                    best_loss = rounded_loss
+                    best_bitstring = rounded
 
-            # 执行矩阵乘法
-            cut_value_from_training = -(transposed_bitstring @ Q_long @ best_bitstring_long)
-
-            # cut_value_from_training = -(best_bitstring.long().permute(*torch.arange(best_bitstring.ndim - 1, -1, -1)) @ Q @ best_bitstring.long())
+            bitstring_list = list(best_bitstring)
+            cut_value_from_training = -model.loss(prob=best_bitstring.float(), Q=Q)
 
-            # cut_value_from_training = -(best_bitstring.T @ Q @ best_bitstring)
             cut_vals.append(cut_value_from_training)
         result = max(cut_vals)
         metric = model.metric(maxcut=result, total_edges=4694)
@@ -10,7 +10,10 @@ from torch_geometric.data import Data
 from torch_geometric.nn import GCNConv, GATConv, GINConv, SAGEConv, ChebConv, ARMAConv, GraphConv
 from torch_geometric.nn import MessagePassing
 
-from for_other_dataset_exp.llm4gnas.utils.utils import compute_metric
+from for_other_dataset_exp.llm4gnas.utils.utils import compute_metric, co_module
+
+# CO 的 QUBO 损失（稠密 Q 和 (row, col, weight, diag) 边列表两种形式）与 for_CO_exp 共用
+co_corefunc = co_module('co_corefunc')
 
 
 class TaskHead(nn.Module):
@@ -102,9 +105,8 @@ class CO_problem(TaskHead):
         return x
 
     def task_loss(self, prob, Q):
-        probs_ = torch.unsqueeze(prob, 1)
-        loss = (probs_.T @ Q @ probs_).squeeze()
-        return loss
+        # Q 为稠密矩阵或 (row, col, weight, diag)，后者按边 O(E) 计算（见 for_CO_exp/co_corefunc.loss_func）
+        return co_corefunc.loss_func(prob, Q)
 
     def task_metric(self, maxcut, total_edges):
         result = maxcut / total_edges
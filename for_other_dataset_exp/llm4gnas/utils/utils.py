@@ -1,5 +1,7 @@
+import importlib
 import os
 import random
+import sys
 
 import numpy as np
 import torch
@@ -32,3 +34,15 @@ def compute_metric(predictions, labels):
         correct_predictions = (torch.argmax(predictions, dim=1) == labels)
         acc = correct_predictions.sum().cpu().item() / labels.shape[0]
     return acc
+
+
+# for_CO_exp 不是安装的包，其中的模块互相按平铺的模块名导入（如 graph_cache 导入 load_data），
+# 因此把该目录追加到 sys.path 末尾后按模块名导入，llm4gnas 单独导入时也能使用，每个模块只加载一份
+co_dir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), *[os.pardir] * 3, 'for_CO_exp'))
+
+
+def co_module(name):
+    # CO 相关的 QUBO 构造、损失、取整和图读取与 for_CO_exp 共用同一份实现，如 co_module('co_corefunc')
+    if co_dir not in sys.path:
+        sys.path.append(co_dir)
+    return importlib.import_module(name)